@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from hotstring_backend import FakeKeyboardBackend
+from hotstring_engine import HotstringEngine
+from hotstring_injector import PACING_NONE
+
+
+# Benchmark determinístico: reproduz um texto sintético digitado contra bibliotecas de
+# 100 a 100k hotstrings, usando o teclado em memória (roda sem display e sem permissões).
+# As teclas passam pelo caminho real: hook -> EventPipeline -> HotstringEngine -> Injector
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+TRIGGER_CHARS = string.ascii_lowercase + string.digits + ".@#"
+
+
+def random_word(rng, min_length, max_length, chars=string.ascii_lowercase):
+    return "".join(rng.choice(chars) for _ in range(rng.randint(min_length, max_length)))
+
+
+def make_hotstrings(size, rng):
+    hotstrings = []
+    for index in range(size):
+        hotstrings.append({
+            "triggers": [random_word(rng, 4, 12, TRIGGER_CHARS) for _ in range(rng.randint(1, 3))],
+            "replacement": random_word(rng, 10, 300, string.ascii_letters + " \n"),
+            "category": f"cat{index % 20}",
+            "prefix": "",
+            "backCount": rng.randint(0, 3),
+        })
+    return hotstrings
+
+
+def make_corpus(hotstrings, words, rng, hit_ratio):
+    # Mistura triggers reais com palavras comuns (que não disparam nada)
+    triggers = [trigger for hotstring in hotstrings for trigger in hotstring["triggers"]]
+    return [rng.choice(triggers) if rng.random() < hit_ratio else random_word(rng, 2, 10) for _ in range(words)]
+
+
+def start_engine(folder, backend):
+    engine = HotstringEngine(backend, config_file=os.path.join(folder, "hotstrings.json"),
+                             snapshot_file=os.path.join(folder, "hotstrings.cache"),
+                             stats_file=os.path.join(folder, "hotstrings.stats.json"),
+                             pacing_file=os.path.join(folder, "hotstrings.pacing.json"), snippet_processes=False)
+    # Sem pausas nem clipboard: mede o custo do motor, não o do aplicativo de destino
+    engine.injector.pacing = PACING_NONE
+    engine.injector.clipboard = None
+    # O índice de busca é construído em segundo plano; espera para não disputar a CPU com as teclas
+    engine.search_ready.wait()
+    return engine
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def run(size, words, seed, hit_ratio):
+    rng = random.Random(seed * 1000003 + size)
+    hotstrings = make_hotstrings(size, rng)
+    corpus = make_corpus(hotstrings, words, rng, hit_ratio)
+
+    with tempfile.TemporaryDirectory() as folder:
+        with open(os.path.join(folder, "hotstrings.json"), "w") as file:
+            json.dump({"hotstrings": hotstrings}, file)
+
+        # Início a frio (JSON), depois a partir do snapshot binário e, por último, a memória
+        # do motor carregado (o tracemalloc deixaria os tempos de início mais lentos)
+        start = time.perf_counter()
+        engine = start_engine(folder, FakeKeyboardBackend())
+        build_time = time.perf_counter() - start
+        engine.close()
+        start = time.perf_counter()
+        engine = start_engine(folder, FakeKeyboardBackend())
+        snapshot_time = time.perf_counter() - start
+        engine.close()
+        tracemalloc.start()
+        backend = FakeKeyboardBackend()
+        engine = start_engine(folder, backend)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # Cada tecla é enviada pelo hook com o instante do envio; a thread consumidora mede do
+        # hook até o fim do match (e da injeção, quando há expansão)
+        match_times = []
+        expand_times = []
+        processed = threading.Event()
+        on_key = engine.events.on_key
+
+        def timed_on_key(name, event_time):
+            injected = len(backend.injected)
+            on_key(name, event_time)
+            elapsed = time.perf_counter() - event_time
+            (expand_times if len(backend.injected) != injected else match_times).append(elapsed)
+            processed.set()
+
+        engine.events.on_key = timed_on_key
+        try:
+            for word in corpus:
+                for char in word + " ":
+                    processed.clear()
+                    backend.press({" ": "space"}.get(char, char), time.perf_counter())
+                    processed.wait()
+        finally:
+            engine.close()
+
+    return {
+        "size": size,
+        "build_ms": build_time * 1000,
+        "snapshot_ms": snapshot_time * 1000,
+        "memory_mb": memory / 1024 / 1024,
+        "keystrokes": len(match_times) + len(expand_times),
+        "expansions": len(expand_times),
+        "match_p50_us": percentile(match_times, 50) * 1e6,
+        "match_p99_us": percentile(match_times, 99) * 1e6,
+        "expand_p50_us": percentile(expand_times, 50) * 1e6,
+        "expand_p99_us": percentile(expand_times, 99) * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keystroke replay benchmark for the hotstring engine.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="library sizes to test")
+    parser.add_argument("--words", type=int, default=5000, help="words typed per library size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--hit-ratio", type=float, default=0.2, help="fraction of typed words that are triggers")
+    parser.add_argument("--max-match-p99-us", type=float, help="fail if the hook-to-match p99 of keystrokes without expansion exceeds this")
+    parser.add_argument("--max-expand-p99-us", type=float, help="fail if the hook-to-injection p99 of expanding keystrokes exceeds this")
+    args = parser.parse_args(argv)
+
+    columns = ["size", "build_ms", "snapshot_ms", "memory_mb", "keystrokes", "expansions",
+               "match_p50_us", "match_p99_us", "expand_p50_us", "expand_p99_us"]
+    print(" ".join(f"{column:>13}" for column in columns))
+    failed = False
+    for size in args.sizes:
+        result = run(size, args.words, args.seed, args.hit_ratio)
+        print(" ".join(f"{result[column]:>13.2f}" if isinstance(result[column], float) else f"{result[column]:>13}"
+                       for column in columns))
+        if args.max_match_p99_us is not None and result["match_p99_us"] > args.max_match_p99_us:
+            failed = True
+        if args.max_expand_p99_us is not None and result["expand_p99_us"] > args.max_expand_p99_us:
+            failed = True
+
+    if failed:
+        print("Benchmark thresholds exceeded.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
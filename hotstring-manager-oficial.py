@@ -1,12 +1,8 @@
-import json
+import logging
 import tkinter as tk
-from tkinter import ttk, messagebox
-import keyboard
+from tkinter import ttk, messagebox, filedialog
 import threading
 import re
-import time
-import ast
-import datetime
 
 # import ctypes
 # import subprocess
@@ -14,40 +10,64 @@ import datetime
 # import sys
 import pyuac
 
+from hotstring_ahk import read_ahk, write_ahk
+from hotstring_engine import PROFILE_HOTKEY, HotstringEngine
+from hotstring_log import log, setup_logging
+from hotstring_virtual_tree import VirtualTreeview
 
-CONFIG_FILE = "hotstrings.json"
+
+REFRESH_INTERVAL = 1000  # ms entre verificações de alterações feitas pelo motor (recarga do hotstrings.json)
+SEARCH_DELAY = 150  # ms sem digitar antes de executar a busca
 
 class HotstringManager:
-    def __init__(self, master):
+    def __init__(self, master, engine=None):
         self.master = master
         self.master.title("Gerenciador de Hotstrings")
-        
-
-        # Carregar hotstrings do arquivo de configuração
-        self.hotstrings = self.load_hotstrings()
 
-        # Configurar escuta de hotstrings
-        self.setup_hotstring_listener()
+        # A interface só edita e exibe; o motor (hook, matcher, injeção, arquivo) pode já estar
+        # rodando sem interface (hotstring_daemon.py) e a janela se conecta a ele sob demanda
+        self.attached = engine is not None
+        self.engine = engine if engine is not None else HotstringEngine()
+        self.version = self.engine.version
+        self.search_after = None
 
         # Widgets da interface
         self.create_widgets()
 
-        # Iniciar o monitoramento de teclado em um thread separado
-        self.keyboard_thread = threading.Thread(target=self.start_keyboard_listener, daemon=True)
-        self.keyboard_thread.start()
+        # Erros de sintaxe dos snippets são informados no carregamento, não quando o trigger é digitado
+        if self.engine.snippet_errors:
+            messagebox.showwarning("Invalid Snippets", "\n".join(self.engine.snippet_errors))
 
-    def load_hotstrings(self):
-        try:
-            with open(CONFIG_FILE, "r") as file:
-                data = json.load(file)
-                return data["hotstrings"]
-        except FileNotFoundError:
-            return []
+        # Atualiza a lista quando o motor recarrega alterações externas
+        self.master.after(REFRESH_INTERVAL, self.check_engine)
+
+        if not self.attached:
+            # Iniciar o monitoramento de teclado em um thread separado
+            self.keyboard_thread = threading.Thread(target=self.start_keyboard_listener, daemon=True)
+            self.keyboard_thread.start()
 
-    def save_hotstrings(self):
-        data = {"hotstrings": self.hotstrings}
-        with open(CONFIG_FILE, "w") as file:
-            json.dump(data, file, indent=4)
+    @property
+    def library(self):
+        # Versão publicada mais recente (imutável: pode ser percorrida enquanto o motor edita)
+        return self.engine.library
+
+    def check_engine(self):
+        try:
+            if self.engine.version != self.version:
+                self.version = self.engine.version
+                # Reaplica a busca atual; a Treeview só atualiza as linhas visíveis que mudaram
+                self.refresh_view()
+                self.category_combobox["values"] = self.get_categories()
+                self.filter_combobox["values"] = self.get_categories()
+                self.profile_combobox["values"] = self.engine.profile_names()
+            # O perfil também pode ser trocado pelo atalho global
+            if self.profile_combobox.get() != self.engine.profile:
+                self.profile_combobox.set(self.engine.profile)
+        finally:
+            self.master.after(REFRESH_INTERVAL, self.check_engine)
+
+    def close(self):
+        self.engine.close()
 
     def create_widgets(self):
         # Campo para adicionar nova hotstring
@@ -77,16 +97,29 @@ class HotstringManager:
         self.backcount_spinbox = tk.Spinbox(self.add_frame, from_=0, to=100, width=5)  # Valor de 0 a 100
         self.backcount_spinbox.grid(row=1, column=3, padx=5, pady=5, sticky="ew")
 
-        tk.Button(self.add_frame, text="Add", command=self.add_hotstring).grid(row=1, column=4, padx=5, pady=5)
+        # Opções no formato do AutoHotkey (vazio/C: caixa exata, C0: ignora a caixa e a replica,
+        # C1: ignora sem replicar, *: dispara sem tecla final, ?: dispara também no fim de uma palavra)
+        tk.Label(self.add_frame, text="Options:").grid(row=1, column=4, padx=5, pady=5, sticky="w")
+        self.options_entry = tk.Entry(self.add_frame, width=8)
+        self.options_entry.grid(row=1, column=5, padx=5, pady=5, sticky="w")
+
+        tk.Button(self.add_frame, text="Add", command=self.add_hotstring).grid(row=1, column=6, padx=5, pady=5)
 
         # Lista de hotstrings
-        self.tree = ttk.Treeview(self.master, columns=("trigger", "replacement", "category", "prefix", "backCount"), show="headings")
+        self.tree_frame = tk.Frame(self.master)
+        self.tree_frame.pack(pady=10, fill="both", expand=True)
+        self.tree = ttk.Treeview(self.tree_frame, columns=("trigger", "replacement", "category", "prefix", "backCount"), show="headings")
         self.tree.heading("trigger", text="Trigger")
         self.tree.heading("replacement", text="Replacement")
         self.tree.heading("category", text="Category")
         self.tree.heading("prefix", text="Prefix")
         self.tree.heading("backCount", text="backCount")
-        self.tree.pack(pady=10, fill="both", expand=True)
+        self.tree_scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical")
+        self.tree_scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
+
+        # Só as linhas visíveis existem na Treeview; buscas e filtros trocam a lista de registros exibida
+        self.view = VirtualTreeview(self.tree, self.tree_scrollbar, self.tree_values)
         
         # Define a largura das colunas para 0 para escondê-las
         self.tree.column("category", width=0, stretch=tk.NO)
@@ -110,21 +143,51 @@ class HotstringManager:
         self.filter_combobox = ttk.Combobox(self.search_frame, values=self.get_categories())
         self.filter_combobox.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
         self.filter_combobox.bind("<<ComboboxSelected>>", self.filter_by_category)
+
+        # Busca por expressão regular (varredura completa, mais lenta) só quando marcada
+        self.regex_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.search_frame, text="Regex", variable=self.regex_var, command=self.run_search).grid(row=0, column=4, padx=5, pady=5)
         # Botão de delete
         tk.Button(self.master, text="Delete", command=self.delete_hotstring).pack(pady=10)
+
+        # Importação/exportação de arquivos .ahk do AutoHotkey
+        self.ahk_frame = tk.Frame(self.master)
+        self.ahk_frame.pack(pady=(0, 10))
+        tk.Button(self.ahk_frame, text="Import AHK", command=self.import_ahk).grid(row=0, column=0, padx=5)
+        tk.Button(self.ahk_frame, text="Export AHK", command=self.export_ahk).grid(row=0, column=1, padx=5)
+
+        # Perfil ativo: só as categorias do perfil expandem (troca imediata, sem recarregar o hook)
+        tk.Label(self.ahk_frame, text="Profile:").grid(row=0, column=2, padx=5, sticky="w")
+        self.profile_combobox = ttk.Combobox(self.ahk_frame, values=self.engine.profile_names(), state="readonly")
+        self.profile_combobox.set(self.engine.profile)
+        self.profile_combobox.grid(row=0, column=3, padx=5, sticky="ew")
+        self.profile_combobox.bind("<<ComboboxSelected>>", self.select_profile)
         # tk.Button(self.master, text="Delete", command=self.delete_hotstring).grid(row=1, column=4, padx=5, pady=5)
 
 
 
+    def select_profile(self, event):
+        self.engine.set_profile(self.profile_combobox.get())
+
     def get_categories(self):
-        categories = set(hotstring["category"] for hotstring in self.hotstrings)
-        return ["All"] + list(categories)
+        return ["All"] + self.library.categories()
 
     def load_tree(self):
-        for hotstring in self.hotstrings:
-            triggers = ', '.join(hotstring["triggers"])
-            # self.tree.insert("", "end", values=(triggers, hotstring["replacement"], hotstring["category"], hotstring["prefix"]))
-            self.tree.insert("", "end", values=(triggers, hotstring["replacement"], hotstring["category"], hotstring["prefix"], hotstring.get("backCount", 0)))
+        self.view.set_rows(self.library.all())
+
+    def tree_values(self, hotstring):
+        triggers = ', '.join(hotstring["triggers"])
+        # self.tree.insert("", "end", values=(triggers, hotstring["replacement"], hotstring["category"], hotstring["prefix"]))
+        return (triggers, hotstring["replacement"], hotstring["category"], hotstring["prefix"], hotstring.get("backCount", 0))
+
+    def refresh_view(self):
+        # Reaplica a busca/filtro atual depois de uma alteração na biblioteca
+        if self.search_entry.get().strip():
+            self.run_search()
+        elif self.filter_combobox.get() not in ("", "All"):
+            self.filter_by_category(None)
+        else:
+            self.load_tree()
 
 
     def add_hotstring(self):
@@ -133,6 +196,7 @@ class HotstringManager:
         category = self.category_combobox.get()
         prefix = self.prefix_entry.get()
         back_count = self.backcount_spinbox.get() or 0  # Novo campo para backCount, padrão "0"
+        options = self.options_entry.get().strip()
 
         if not triggers or not replacement:
             messagebox.showwarning("Warning", "Trigger and Replacement fields must be filled!")
@@ -146,18 +210,25 @@ class HotstringManager:
 
         # hotstring = {"triggers": triggers, "replacement": replacement, "category": category, "prefix": prefix}
         hotstring = {"triggers": triggers, "replacement": replacement, "category": category, "prefix": prefix, "backCount": int(back_count)}
-        self.hotstrings.append(hotstring)
-        self.save_hotstrings()
+        if options:
+            hotstring["options"] = options
+        # Valida o snippet antes de salvar
+        try:
+            self.engine.add_hotstring(hotstring)
+        except SyntaxError as e:
+            messagebox.showerror("Invalid Snippet", f"Erro de sintaxe: {e}")
+            return
+        except ValueError as e:
+            messagebox.showerror("Invalid Template", f"Template inválido: {e}")
+            return
 
         # self.tree.insert("", "end", values=(trigger, replacement, category, prefix))
-        self.tree.insert("", "end", values=(', '.join(triggers), replacement, category, prefix, back_count))
+        self.refresh_view()
         self.trigger_entry.delete(0, tk.END)
         self.replacement_entry.delete(0, tk.END)
         self.category_combobox.set('')  # Limpa o combobox
         self.prefix_entry.delete(0, tk.END)  # Limpa o campo de prefixo
-
-        # Reconfigurar hotstrings após adicionar
-        self.setup_hotstring_listener()
+        self.options_entry.delete(0, tk.END)
 
     def on_category_combobox_focus_out(self, event):
         category = self.category_combobox.get()
@@ -165,12 +236,24 @@ class HotstringManager:
             self.category_combobox["values"] = self.get_categories() + [category]
 
     def search_hotstrings(self, event):
+        # Debounce: cada tecla cancela a busca pendente e agenda uma nova
+        if self.search_after is not None:
+            self.master.after_cancel(self.search_after)
+        self.search_after = self.master.after(SEARCH_DELAY, self.run_search)
+
+    def run_search(self):
+        self.search_after = None
         query = self.search_entry.get().strip()  # Remove espaços extras antes e depois da consulta
         if not query:
             # Se a consulta estiver vazia, exibe todos os hotstrings
             self.load_tree()
             return
 
+        if not self.regex_var.get():
+            # Busca pelo índice de trigramas, com resultados ordenados por relevância
+            self.view.set_rows(self.engine.search(query))
+            return
+
         # Compila a expressão regular com a consulta, garantindo a correspondência correta
         try:
             pattern = re.compile(query, re.IGNORECASE)  # Usa re.IGNORECASE para corresponder sem distinguir maiúsculas e minúsculas
@@ -178,176 +261,86 @@ class HotstringManager:
             messagebox.showerror("Invalid Regex", "The search query is not a valid regular expression.")
             return
 
-        # Limpa a Treeview
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Insere os hotstrings que correspondem à expressão regular
-        for hotstring in self.hotstrings:
+        # Exibe os hotstrings que correspondem à expressão regular
+        matches = []
+        for hotstring in self.library:
             triggers = ', '.join(hotstring["triggers"])  # Concatena todos os triggers em uma string
             replacement = hotstring["replacement"]
             
             # Verifica se a regex corresponde a triggers ou replacement
             if pattern.search(triggers) or pattern.search(replacement):
-                self.tree.insert("", "end", values=(
-                    ', '.join(hotstring["triggers"]), 
-                    hotstring["replacement"], 
-                    hotstring["category"], 
-                    hotstring["prefix"]
-                ))
+                matches.append(hotstring)
+        self.view.set_rows(matches)
                 
     def filter_by_category(self, event):
         selected_category = self.filter_combobox.get()
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for hotstring in self.hotstrings:
-            if selected_category == "All" or hotstring["category"] == selected_category:
-                triggers = ', '.join(hotstring["triggers"])
-                self.tree.insert("", "end", values=(triggers, hotstring["replacement"], hotstring["category"], hotstring["prefix"]))
+        if selected_category == "All":
+            self.view.set_rows(self.library.all())
+        else:
+            self.view.set_rows(self.library.in_category(selected_category))
 
     def delete_hotstring(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
+        if not self.tree.selection():
             messagebox.showwarning("Warning", "No hotstring selected for deletion.")
             return
 
-        item_values = self.tree.item(selected_item, "values")
-        if not item_values:
+        # Os slots da lista virtual apontam diretamente para os registros selecionados
+        removed = self.view.selected_records()
+        if not removed:
             messagebox.showwarning("Warning", "No data found for selected hotstring.")
             return
 
-        triggers, replacement, category, prefix, back_count = item_values
-
-        # Corrige a busca pela hotstring a ser removida
-        # Formata os triggers como uma lista de strings
-        triggers_list = triggers.split(', ')
-        # self.hotstrings = [hs for hs in self.hotstrings if not (hs["trigger"] == triggers and hs["replacement"] == replacement)]
-        
-        # Remove o hotstring da lista
-        self.hotstrings = [hs for hs in self.hotstrings if not (
-            set(hs["triggers"]) == set(triggers_list) and
-            hs["replacement"] == replacement and
-            hs["category"] == category and
-            hs["prefix"] == prefix and
-            str(hs.get("backCount", 0)) == back_count  # Comparar backCount como string
-        )]
-        
-        # Atualiza o arquivo de configuração
-        self.save_hotstrings()
+        # O motor remove os triggers e atualiza o arquivo de configuração
+        self.engine.delete_hotstrings(removed)
 
         # Remove a hotstring da Treeview
-        self.tree.delete(selected_item)
-
-        # Reconfigurar hotstrings após exclusão
-        self.setup_hotstring_listener()
+        self.tree.selection_set(())
+        self.refresh_view()
 
-    def setup_hotstring_listener(self):
-        # Remove listeners
-        keyboard.unhook_all()
-
-        # Adicionar hotstrings
-        for hotstring in self.hotstrings:
-            triggers = hotstring["triggers"]
-            replacement = hotstring["replacement"]
-            prefix = hotstring["prefix"]
-            back_count = hotstring.get("backCount", 0)
-            # if prefix:
-            #     # trigger = prefix + trigger  # Adiciona o prefixo ao trigger
-            #     triggers = [prefix + trigger for trigger in triggers]  # Adiciona o prefixo a cada trigger
-            for trigger in triggers:
-                # print(f"Adding hotstring: '{trigger}' -> '{replacement}'")  # Adicione este print para depuração
-                # keyboard.add_abbreviation(trigger, replacement)
-                print(f"Adding hotstring: '{trigger}' -> '{replacement}' with backCount: {back_count}")  # Adicione este print para depuração
-                # Adicionar o listener para detectar o texto digitado e substituir
-                keyboard.add_word_listener(
-                    trigger,
-                    self.create_callback(trigger, replacement, back_count),
-                    triggers=['space'],
-                    match_suffix=False,
-                    timeout=25
-                )
-                # keyboard.add_abbreviation(trigger, lambda: replace_with_back_count(replacement, back_count))
-                # keyboard.add_abbreviation(trigger, lambda: self.replace_with_back_count(replacement, back_count))
-                # keyboard.add_abbreviation(trigger, lambda: self.replace_with_back_count(replacement, back_count))
-    def create_callback(self, trigger, replacement, back_count):
-        def callback():
-            # Remove o texto digitado com backspace
-            trigger_length = len(trigger)+1
-            for _ in range(trigger_length):
-                keyboard.press_and_release('backspace')
-                time.sleep(0.01)  # Pequena pausa para garantir que o backspace é registrado
-                
-            # try:
-            #     # Verifica se o código é sintaticamente válido
-            #     ast.parse(replacement)
-                
-            #     # Executa o código se for válido
-            #     exec_globals = {}
-            #     exec_locals = {}
-            #     exec(replacement, exec_globals, exec_locals)
-                
-            #     # Retorna o resultado, assumindo que a variável 'result' está definida
-            #     result = exec_locals.get('result', "Nada")
-            #     print(result)
-            # except SyntaxError:
-            #     # Código inválido
-            #     result = replacement
-            if replacement.startswith("python "):
-                # Remove o prefixo 'python ' do replacement
-                code = replacement[len("python "):]
-                
-                try:
-                    # Verifica se o código é sintaticamente válido
-                    ast.parse(code)
-                    
-                    # Executa o código se for válido
-                    exec_globals = {}
-                    exec_locals = {}
-                    exec(code, exec_globals, exec_locals)
-                    
-                    # Retorna o resultado, assumindo que a variável 'result' está definida
-                    result = exec_locals.get('result', 'Nenhum resultado encontrado.')
-                    keyboard.write(result)
-                    
-                except SyntaxError as e:
-                    # Retorna a mensagem de erro de sintaxe
-                    return f"Erro de sintaxe: {e}"
-                except Exception as e:
-                    # Retorna qualquer outro erro
-                    return f"Erro durante a execução: {e}"
-            else:
-                keyboard.write(replacement)
-                time.sleep(0.01)  # Pequena pausa para garantir que o texto seja escrito
-                # Simula pressionar a tecla Left `back_count` vezes
-                for _ in range(back_count):
-                    keyboard.press_and_release('left')
-                    time.sleep(0.01)  # Pequena pausa para garantir que o movimento do cursor é registrado
-
-
-        return callback
-    def execute_backspace(self, replacement, back_count):
-        # Digita o texto de substituição
-        keyboard.write(replacement)
-        time.sleep(0.0)  # Pequena pausa para garantir que o texto seja escrito
-
-        # Simula pressionar a tecla Backspace `back_count` vezes
-        for _ in range(back_count):
-            # keyboard.press_and_release('backspace')
-            keyboard.press_and_release('left')
-            time.sleep(0.00)  # Pequena pausa para garantir que o backspace é registrado
+    def import_ahk(self):
+        path = filedialog.askopenfilename(filetypes=[("AutoHotkey", "*.ahk"), ("All files", "*.*")])
+        if not path:
+            return
+        skipped = []
+        with open(path, "r", encoding="utf-8-sig") as file:
+            # O arquivo é lido em streaming e o listener é atualizado uma única vez no fim
+            count = self.engine.import_hotstrings(read_ahk(file, skipped))
+        self.refresh_view()
+        self.category_combobox["values"] = self.get_categories()
+        self.filter_combobox["values"] = self.get_categories()
+        message = f"Imported {count} hotstrings."
+        if skipped:
+            message += f"\n\nSkipped {len(skipped)}:\n" + "\n".join(skipped[:20])
+        messagebox.showinfo("Import AHK", message)
+
+    def export_ahk(self):
+        path = filedialog.asksaveasfilename(defaultextension=".ahk", filetypes=[("AutoHotkey", "*.ahk")])
+        if not path:
+            return
+        skipped = []
+        with open(path, "w", encoding="utf-8") as file:
+            count = write_ahk(self.library.all(), file, skipped)
+        message = f"Exported {count} hotstrings."
+        if skipped:
+            message += f"\n\nSkipped {len(skipped)}:\n" + "\n".join(skipped[:20])
+        messagebox.showinfo("Export AHK", message)
 
     def start_keyboard_listener(self):
         # Iniciar o monitoramento dos eventos de teclado
-        print("Hotstring listener active. Press 'esc' to exit.")
-        keyboard.wait("shift+ctrl+esc")  # Use a tecla 'esc' para terminar o script
+        log(logging.INFO, "Hotstring listener active", exit="shift+ctrl+esc", profile=PROFILE_HOTKEY)
+        self.engine.backend.add_hotkey(PROFILE_HOTKEY, self.engine.cycle_profile)
+        self.engine.backend.wait("shift+ctrl+esc")  # Use a tecla 'esc' para terminar o script
         
 if __name__ == "__main__":
     if not pyuac.isUserAdmin():
         print("Re-launching as admin!")
         pyuac.runAsAdmin()
     else:
+        # Logs em buffer, gravados por uma thread de fundo (HOTSTRINGS_LOG_LEVEL=DEBUG para ver cada trigger)
+        handler = setup_logging()
         root = tk.Tk()
         app = HotstringManager(root)
         root.mainloop()
+        app.close()
+        handler.close()
 
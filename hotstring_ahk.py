@@ -0,0 +1,247 @@
+import argparse
+import re
+import sys
+
+from hotstring_matcher import CASE_CONFORM, CASE_INSENSITIVE, CASE_SENSITIVE, parse_options
+
+
+# Arquivos .ahk de hotstrings (:opções:abreviação::substituição), lidos e gravados em streaming:
+# uma entrada por vez, sem carregar o arquivo inteiro
+CATEGORY_COMMENT = re.compile(r"^;\s*category:\s*(.*?)\s*$", re.IGNORECASE)
+HOTSTRING_LINE = re.compile(r"^:([^:]*):(.+?)::(.*)$")
+LEFT_SUFFIX = re.compile(r"\{Left(?: (\d+))?\}$", re.IGNORECASE)
+SEND_KEYS = {"enter": "\n", "tab": "\t", "space": " "}
+SEND_SPECIAL = "{}!^+#"
+# Opções que mudam a expansão e não têm equivalente no esquema (guardadas em "options" para a exportação)
+UNSUPPORTED_OPTIONS = ("X",)
+
+
+def escape_cc(text):
+    # Mesmo papel do escape_cc do hostring-manager-test.py, com as sequências do AutoHotkey
+    text = text.replace("`", "``")
+    text = text.replace("\n", "`n")
+    text = text.replace("\t", "`t")
+    text = text.replace("\b", "`b")
+    text = text.replace("\r", "`r")
+    text = text.replace(";", "`;")
+    return text
+
+
+def unescape_cc(text):
+    result = []
+    chars = iter(text)
+    for char in chars:
+        if char != "`":
+            result.append(char)
+            continue
+        char = next(chars, "`")
+        result.append({"n": "\n", "t": "\t", "b": "\b", "r": "\r", "s": " "}.get(char, char))
+    return "".join(result)
+
+
+def split_comment(text):
+    # Separa o comentário " ;" do fim da linha (um `; escapado não inicia comentário)
+    escaped = False
+    for index, char in enumerate(text):
+        if escaped:
+            escaped = False
+        elif char == "`":
+            escaped = True
+        elif char == ";" and (index == 0 or text[index - 1] in " \t"):
+            return text[:index].rstrip(), text[index + 1:].strip()
+    return text, ""
+
+
+def encode_send(text):
+    # Caracteres especiais do Send entre chaves ({!}, {{}...)
+    return "".join("{" + char + "}" if char in SEND_SPECIAL else char for char in text)
+
+
+def decode_send(text):
+    def replace(match):
+        key = match.group(1)
+        if len(key) == 1:
+            return key
+        return SEND_KEYS.get(key.lower(), match.group(0))
+    return re.sub(r"\{([^{}]+|[{}])\}", replace, text)
+
+
+def to_hotstring(options, abbreviation, replacement, comment, category):
+    raw = any(option.upper() in ("R", "T") for option in parse_options(options))
+    back_count = 0
+    if not raw:
+        # {Left N} no fim da substituição vira backCount (cursor volta N posições)
+        match = LEFT_SUFFIX.search(replacement)
+        if match:
+            back_count = int(match.group(1) or 1)
+            replacement = replacement[:match.start()]
+        replacement = decode_send(replacement)
+    hotstring = {"triggers": [abbreviation], "replacement": replacement, "category": category, "prefix": "", "backCount": back_count}
+    if not any(option.upper() in (CASE_SENSITIVE, CASE_CONFORM, CASE_INSENSITIVE) for option in parse_options(options)):
+        # No AutoHotkey a ausência de C significa C0: fica registrado para manter a semântica
+        options += CASE_CONFORM
+    if options:
+        hotstring["options"] = options
+    if comment:
+        hotstring["comment"] = comment
+    return hotstring
+
+
+def read_entries(lines, skipped=None):
+    # Gera (número da linha, opções, abreviação, substituição, comentário, categoria) para cada hotstring
+    category = ""
+    lines = iter(enumerate(lines, 1))
+    # Próxima linha ainda não processada (a procura do bloco de continuação lê uma linha à frente)
+    entry = next(lines, None)
+    while entry is not None:
+        number, line = entry
+        entry = next(lines, None)
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        match = CATEGORY_COMMENT.match(stripped)
+        if match:
+            category = match.group(1)
+            continue
+        match = HOTSTRING_LINE.match(stripped)
+        if match is None:
+            continue
+        options, abbreviation, rest = match.groups()
+        rest, comment = split_comment(rest)
+        if rest.strip():
+            yield number, options, abbreviation, unescape_cc(rest.strip()), comment, category
+            continue
+
+        # Substituição em várias linhas: bloco de continuação "( ... )"; qualquer outra coisa é código
+        start = number
+        while entry is not None and not entry[1].strip():
+            entry = next(lines, None)
+        if entry is None or entry[1].strip() != "(":
+            # A linha lida à frente não é consumida: se for outra hotstring, é lida normalmente
+            if skipped is not None:
+                skipped.append(f"line {start}: '{abbreviation}' runs code, not text")
+            continue
+        entry = next(lines, None)
+        body = []
+        while entry is not None:
+            number, line = entry
+            entry = next(lines, None)
+            line = line.rstrip("\r\n")
+            if line.lstrip().startswith(")"):
+                break
+            body.append(unescape_cc(line))
+        yield start, options, abbreviation, "\n".join(body), comment, category
+
+
+def read_ahk(lines, skipped=None):
+    # Converte as entradas para o esquema do hotstrings.json; entradas seguidas com a mesma
+    # substituição (aliases) viram um único registro com vários triggers
+    current = None
+    for number, options, abbreviation, replacement, comment, category in read_entries(lines, skipped):
+        if any(option in UNSUPPORTED_OPTIONS for option in parse_options(options)):
+            if skipped is not None:
+                skipped.append(f"line {number}: '{abbreviation}' uses an unsupported option ({options})")
+            continue
+        hotstring = to_hotstring(options, abbreviation, replacement, comment, category)
+        if current is not None and {**current, "triggers": None} == {**hotstring, "triggers": None}:
+            current["triggers"].append(abbreviation)
+            continue
+        if current is not None:
+            yield current
+        current = hotstring
+    if current is not None:
+        yield current
+
+
+def format_hotstring(hotstring):
+    # Linhas .ahk de um registro (uma por trigger)
+    options = hotstring.get("options", "")
+    if not any(option.upper() in (CASE_SENSITIVE, CASE_CONFORM, CASE_INSENSITIVE) for option in parse_options(options)):
+        # Sem opção de caixa o registro é exato; no AutoHotkey isso precisa ser explícito (C)
+        options += CASE_SENSITIVE
+    raw = any(option.upper() in ("R", "T") for option in parse_options(options))
+    replacement = hotstring["replacement"]
+    suffix = ""
+    if not raw:
+        replacement = encode_send(replacement)
+        back_count = hotstring.get("backCount", 0)
+        if back_count:
+            suffix = f"{{Left {back_count}}}"
+    comment = f" ; {hotstring['comment']}" if hotstring.get("comment") else ""
+
+    lines = []
+    if "\n" in replacement or replacement != replacement.strip():
+        # Bloco de continuação: quebras de linha e espaços nas pontas são preservados
+        body = [line.replace("`", "``").replace(";", "`;") for line in (replacement + suffix).split("\n")]
+        # Uma linha começando com ")" fecharia o bloco
+        body = ["`" + line if line.lstrip().startswith(")") else line for line in body]
+        for trigger in hotstring["triggers"]:
+            lines.append(f":{options}:{trigger}::{comment}")
+            lines.append("(")
+            lines.extend(body)
+            lines.append(")")
+    else:
+        for trigger in hotstring["triggers"]:
+            lines.append(f":{options}:{trigger}::{escape_cc(replacement)}{suffix}{comment}")
+    return lines
+
+
+def write_ahk(hotstrings, file, skipped=None):
+    # Grava um registro por vez, com um comentário "; category:" a cada troca de categoria
+    from hotstring_snippets import is_snippet
+
+    category = None
+    count = 0
+    for hotstring in hotstrings:
+        if is_snippet(hotstring["replacement"]):
+            if skipped is not None:
+                skipped.append(f"{', '.join(hotstring['triggers'])}: python snippets cannot be exported")
+            continue
+        if hotstring["category"] != category:
+            category = hotstring["category"]
+            file.write(f"\n; category: {category}\n")
+        file.write("\n".join(format_hotstring(hotstring)) + "\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    from hotstring_engine import CONFIG_FILE
+    from hotstring_library import HotstringLibrary
+    from hotstring_storage import HotstringStore
+
+    parser = argparse.ArgumentParser(description="Import or export AutoHotkey hotstring files.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("file", help=".ahk file to read or write")
+    parser.add_argument("--config", default=CONFIG_FILE)
+    parser.add_argument("--category", help="only export this category / import into this category")
+    args = parser.parse_args(argv)
+
+    store = HotstringStore(args.config, snapshot=lambda: library.all())
+    library = HotstringLibrary(store.load())
+    skipped = []
+
+    if args.command == "import":
+        # Uma única regravação do JSON no fim; um gerenciador aberto recarrega a diferença de uma vez
+        count = 0
+        with open(args.file, "r", encoding="utf-8-sig") as file:
+            for hotstring in read_ahk(file, skipped):
+                if args.category:
+                    hotstring["category"] = args.category
+                if library.find_duplicate(hotstring) is None:
+                    library.add(hotstring)
+                    count += 1
+        store.compact()
+        print(f"Imported {count} hotstrings from {args.file}")
+    else:
+        hotstrings = library.in_category(args.category) if args.category else library
+        with open(args.file, "w", encoding="utf-8") as file:
+            count = write_ahk(hotstrings, file, skipped)
+        print(f"Exported {count} hotstrings to {args.file}")
+
+    for message in skipped:
+        print(f"Skipped {message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
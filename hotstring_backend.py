@@ -0,0 +1,122 @@
+import time
+
+
+KEY_DOWN = "down"
+KEY_UP = "up"
+
+
+class KeyboardBackend:
+    # Interface usada pelo manager e pelo Injector para ouvir e injetar teclas
+    echoes = True  # O que é injetado volta pelo hook (o EventPipeline precisa ignorar)
+
+    def hook(self, callback):
+        raise NotImplementedError
+
+    def unhook_all(self):
+        raise NotImplementedError
+
+    def send(self, keys):
+        raise NotImplementedError
+
+    def write(self, text):
+        raise NotImplementedError
+
+    def wait(self, hotkey):
+        raise NotImplementedError
+
+    def add_hotkey(self, hotkey, callback):
+        raise NotImplementedError
+
+
+class SystemKeyboardBackend(KeyboardBackend):
+    # Teclado real via biblioteca `keyboard` (importada só quando usada)
+    def __init__(self):
+        import keyboard
+        self.keyboard = keyboard
+
+    def hook(self, callback):
+        return self.keyboard.hook(callback)
+
+    def unhook_all(self):
+        self.keyboard.unhook_all()
+
+    def send(self, keys):
+        self.keyboard.send(keys)
+
+    def write(self, text):
+        self.keyboard.write(text)
+
+    def wait(self, hotkey):
+        self.keyboard.wait(hotkey)
+
+    def add_hotkey(self, hotkey, callback):
+        return self.keyboard.add_hotkey(hotkey, callback)
+
+
+class FakeKeyEvent:
+    __slots__ = ("event_type", "name", "time")
+
+    def __init__(self, event_type, name, event_time):
+        self.event_type = event_type
+        self.name = name
+        self.time = event_time
+
+
+class FakeKeyboardBackend(KeyboardBackend):
+    # Teclado em memória para testes e benchmarks: type_text() entrega eventos aos hooks
+    # e tudo o que for injetado fica registrado em `injected`; com echo=True o que é injetado
+    # também volta pelos hooks, como acontece com o teclado real
+    def __init__(self, echo=False):
+        self.echo = echo
+        self.hooks = []
+        self.hotkeys = {}
+        self.injected = []  # (tipo, conteúdo, instante)
+
+    @property
+    def echoes(self):
+        return self.echo
+
+    def hook(self, callback):
+        self.hooks.append(callback)
+        return callback
+
+    def unhook_all(self):
+        self.hooks = []
+        self.hotkeys = {}
+
+    def send(self, keys):
+        self.injected.append(("keys", keys, time.perf_counter()))
+        if self.echo:
+            for combo in keys.split(", "):
+                for name in combo.split("+"):
+                    self.press(name)
+
+    def write(self, text):
+        self.injected.append(("text", text, time.perf_counter()))
+        if self.echo:
+            self.type_text(text)
+
+    def wait(self, hotkey):
+        pass
+
+    def add_hotkey(self, hotkey, callback):
+        self.hotkeys[hotkey] = callback
+        return callback
+
+    def press_hotkey(self, hotkey):
+        self.hotkeys[hotkey]()
+
+    def press(self, name, event_time=None):
+        if event_time is None:
+            event_time = time.time()
+        for event_type in (KEY_DOWN, KEY_UP):
+            event = FakeKeyEvent(event_type, name, event_time)
+            for callback in list(self.hooks):
+                callback(event)
+
+    def type_text(self, text):
+        for char in text:
+            self.press({" ": "space", "\n": "enter", "\t": "tab"}.get(char, char))
+
+    def clear(self):
+        self.injected = []
@@ -0,0 +1,68 @@
+import logging
+import os
+import runpy
+import threading
+
+import pyuac
+
+from hotstring_engine import PROFILE_HOTKEY, HotstringEngine
+from hotstring_log import log, setup_logging
+
+
+EDITOR_HOTKEY = "shift+ctrl+h"  # Abre o gerenciador (interface Tk) sobre o motor em execução
+EXIT_HOTKEY = "shift+ctrl+esc"
+GUI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hotstring-manager-oficial.py")
+
+
+class HotstringDaemon:
+    # Roda só o motor de expansão; tkinter e a interface são carregados na primeira vez
+    # que o editor é aberto, e a janela pode ser fechada e reaberta sem parar o hook
+    def __init__(self, engine=None):
+        self.engine = engine if engine is not None else HotstringEngine()
+        self.gui = None
+        self.open_requested = threading.Event()
+        self.stop_requested = threading.Event()
+        self.engine.backend.add_hotkey(EDITOR_HOTKEY, self.open_requested.set)
+        self.engine.backend.add_hotkey(EXIT_HOTKEY, self.stop_requested.set)
+        self.engine.backend.add_hotkey(PROFILE_HOTKEY, self.engine.cycle_profile)
+
+    def run(self):
+        log(logging.INFO, "Hotstring daemon active", editor=EDITOR_HOTKEY, exit=EXIT_HOTKEY,
+            profile=PROFILE_HOTKEY, profiles=self.engine.profile_names())
+        try:
+            while not self.stop_requested.is_set():
+                # A janela roda na thread principal (exigência do Tk); o hook só sinaliza o pedido
+                if self.open_requested.wait(0.5):
+                    self.open_requested.clear()
+                    self.open_editor()
+        finally:
+            self.engine.close()
+
+    def open_editor(self):
+        if self.gui is None:
+            # Importa o script da interface (e o tkinter) apenas agora
+            self.gui = runpy.run_path(GUI_SCRIPT)
+        root = self.gui["tk"].Tk()
+        self.gui["HotstringManager"](root, self.engine)
+
+        # O atalho de saída também fecha a janela aberta
+        def check_stop():
+            if self.stop_requested.is_set():
+                root.destroy()
+            else:
+                root.after(500, check_stop)
+
+        root.after(500, check_stop)
+        root.mainloop()
+
+
+if __name__ == "__main__":
+    if not pyuac.isUserAdmin():
+        print("Re-launching as admin!")
+        pyuac.runAsAdmin()
+    else:
+        handler = setup_logging()
+        try:
+            HotstringDaemon().run()
+        finally:
+            handler.close()
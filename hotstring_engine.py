@@ -0,0 +1,493 @@
+import logging
+import threading
+import time
+
+from hotstring_backend import SystemKeyboardBackend
+from hotstring_events import EventPipeline
+from hotstring_injector import Injector, PACING_ADAPTIVE
+from hotstring_library import HotstringLibrary
+from hotstring_log import log, logger, preview
+from hotstring_matcher import CASE_CONFORM, HotstringMatcher, TrieRoot, conform_case, end_key_text
+from hotstring_pacing import PACING_FILE, PacingController
+from hotstring_search import SearchIndex
+from hotstring_snippets import SnippetCache, SnippetPool, is_snippet
+from hotstring_stats import STATS_FILE, UsageStats
+from hotstring_table import HotstringTable
+from hotstring_templates import Template, is_template
+from hotstring_storage import FileWatcher, HotstringStore, SnapshotCache, diff_hotstrings
+
+
+CONFIG_FILE = "hotstrings.json"
+SNAPSHOT_FILE = "hotstrings.cache"
+ALL_PROFILE = "All"  # Perfil implícito com todas as categorias
+PROFILE_HOTKEY = "shift+ctrl+p"  # Alterna para o próximo perfil
+WATCH_INTERVAL = 1.0  # Segundos entre verificações de alterações externas no hotstrings.json
+
+
+class LibrarySnapshot:
+    # Versão publicada do que a expansão lê: biblioteca, tabela compilada e a raiz da trie de
+    # cada perfil. Nunca é alterada depois de publicada; cada edição monta outra e troca a referência
+    __slots__ = ("library", "table", "roots", "version")
+
+    def __init__(self, library, table, roots, version):
+        self.library = library
+        self.table = table
+        self.roots = roots  # perfil -> raiz da trie só com as categorias do perfil
+        self.version = version
+
+
+class HotstringEngine:
+    # Motor de expansão sem interface: carrega a biblioteca, mantém o matcher e o hook de teclado
+    # e aplica as edições. Não importa tkinter; a interface (HotstringManager) se conecta a ele
+    def __init__(self, backend=None, config_file=CONFIG_FILE, snapshot_file=SNAPSHOT_FILE, stats_file=STATS_FILE,
+                 pacing_file=PACING_FILE, snippet_processes=True):
+        self.config_file = config_file
+
+        # Backend de teclado (real por padrão; FakeKeyboardBackend em testes e benchmarks)
+        self.backend = backend if backend is not None else SystemKeyboardBackend()
+
+        # Motor de injeção de teclas (política de pausa: none, fixed ou adaptive); no modo adaptive o
+        # ritmo é aprendido pelo eco das teclas injetadas e lembrado por sessão
+        self.pacing = PacingController(pacing_file)
+        self.injector = Injector(backend=self.backend, pacing=PACING_ADAPTIVE, controller=self.pacing)
+
+        # O hook só enfileira as teclas; match e injeção rodam numa única thread consumidora,
+        # que ignora o eco das teclas injetadas por ela mesma
+        self.events = EventPipeline(self.on_key, on_overflow=self.on_overflow, pacing=self.pacing)
+        if self.backend.echoes:
+            self.injector.on_inject = self.events.expect
+            self.injector.on_injected = self.events.injected
+
+        # Snippets "python " compilados no carregamento (nunca no caminho da tecla)
+        self.snippets = SnippetCache()
+        self.snippet_errors = []
+
+        # Snippets rodam num pool limitado fora da thread do hook, com timeout. Em processos (padrão),
+        # um snippet que não termina é encerrado; em threads ele ocupa o worker até acabar
+        self.snippet_pool = SnippetPool(workers=2, timeout=2.0, processes=snippet_processes)
+
+        # Disparos e latência por hotstring (python hotstring_stats.py para consultar)
+        self.stats = UsageStats(stats_file)
+        self.stats.start()
+
+        # Edições da interface e recargas do arquivo são serializadas entre si; a expansão não usa
+        # o lock, ela lê a versão publicada em self.state
+        self.lock = threading.RLock()
+
+        # Carregar hotstrings do arquivo de configuração (JSON + journal de alterações)
+        self.store = HotstringStore(config_file, snapshot=lambda: self.library.all())
+        self.snapshot = SnapshotCache(snapshot_file, [config_file, self.store.journal_path])
+
+        # Usa o snapshot binário se o JSON não mudou; senão reconstrói tudo e gera um novo snapshot
+        cached = self.snapshot.load()
+        if cached is not None:
+            library = cached["library"]
+            self.snippets = cached["snippets"]
+            self.snippet_errors = cached["snippet_errors"]
+            self.store.seq, self.store.journal_size, self.store.profiles = cached["store"]
+            self._search_index = cached["search_index"]
+        else:
+            # Registros com id estável e índices por trigger e categoria
+            library = HotstringLibrary(self.load_hotstrings())
+            self._search_index = None
+
+        # Perfis (conjuntos de categorias) que podem ser ativados sem reconstruir o listener
+        self.load_profiles(self.store.profiles)
+
+        # Configurar escuta de hotstrings
+        self.setup_hotstring_listener(library, cached)
+        if cached is None:
+            if self.store.assigned_ids:
+                # Grava os ids recém-atribuídos para que continuem estáveis
+                self.save_hotstrings()
+            self.save_snapshot()
+        self.events.start()
+
+        # Índice de busca: vem do snapshot ou é construído em segundo plano, nunca na thread da interface
+        self.search_ready = threading.Event()
+        if self._search_index is None:
+            threading.Thread(target=self.build_search_index, daemon=True).start()
+        else:
+            self.search_ready.set()
+
+        # Recarrega automaticamente alterações externas (editor de texto, sincronização)
+        self.watcher = FileWatcher(config_file)
+        self.stop_event = threading.Event()
+        self.watch_thread = threading.Thread(target=self.watch_config_file, daemon=True)
+        self.watch_thread.start()
+
+    @property
+    def library(self):
+        return self.state.library
+
+    @property
+    def table(self):
+        return self.state.table
+
+    @property
+    def version(self):
+        # Muda a cada edição publicada (a interface compara para saber quando redesenhar)
+        return self.state.version
+
+    def publish(self, library, table, roots):
+        # Uma única troca de referência: quem lê vê a versão anterior inteira ou a nova inteira
+        self.state = LibrarySnapshot(library, table, roots, self.state.version + 1)
+
+    def profile_names(self):
+        return list(self.profiles)
+
+    def set_profile(self, name):
+        # Troca O(1): as tries de todos os perfis já estão compiladas em self.state.roots
+        if name not in self.profiles:
+            raise KeyError(name)
+        self.profile = name
+        log(logging.INFO, "Profile activated", profile=name)
+
+    def cycle_profile(self):
+        names = self.profile_names()
+        self.set_profile(names[(names.index(self.profile) + 1) % len(names)] if self.profile in names else ALL_PROFILE)
+        return self.profile
+
+    def load_profiles(self, profiles):
+        # {"nome": [categorias]} do hotstrings.json, mais o perfil "All" com tudo
+        self.profiles = {ALL_PROFILE: None}
+        for name, categories in profiles.items():
+            if name != ALL_PROFILE:
+                self.profiles[name] = frozenset(categories)
+        if getattr(self, "profile", None) not in self.profiles:
+            self.profile = ALL_PROFILE
+
+    def reload_profiles(self):
+        # Perfis alterados no hotstrings.json: recompila só as tries dos perfis que mudaram
+        old = self.profiles
+        self.load_profiles(self.store.profiles)
+        if self.profiles == old:
+            return False
+        state = self.state
+        roots = {name: root for name, root in state.roots.items() if self.profiles.get(name, False) == old.get(name)}
+        self.publish(state.library, state.table, self.build_roots(roots, state.library, state.table))
+        return True
+
+    def in_profile(self, profile, hotstring):
+        categories = self.profiles[profile]
+        return categories is None or hotstring["category"] in categories
+
+    def build_roots(self, base_roots, library, table, entries_by_id=None, removed=()):
+        # Aplica as mesmas alterações à trie de cada perfil, filtradas pelas categorias do perfil.
+        # entries_by_id: hotstrings adicionadas/alteradas (já registradas na tabela); removed: registros antigos
+        roots = {}
+        for profile in self.profiles:
+            base = base_roots.get(profile)
+            if base is None:
+                # Perfil sem trie (novo ou alterado): compila do zero a partir da tabela
+                entries = []
+                for hotstring in library:
+                    index = table.index(hotstring["id"])
+                    if index is not None and self.in_profile(profile, hotstring):
+                        entries.extend((trigger, (trigger, index), table[index].mode) for trigger in hotstring["triggers"])
+                roots[profile] = self.matcher.build(TrieRoot(), added=entries)
+                continue
+
+            touched = {trigger for hs in removed if self.in_profile(profile, hs) for trigger in hs["triggers"]}
+            for hotstring_id in entries_by_id or ():
+                hotstring = library.get(hotstring_id)
+                if self.in_profile(profile, hotstring):
+                    touched.update(hotstring["triggers"])
+            # Quando várias hotstrings do perfil usam o mesmo trigger (ou variantes de caixa dele,
+            # que dividem o nó), a ordem decide qual dispara. Todas saem e são recolocadas na ordem
+            # da biblioteca, como na compilação do zero: o resultado não depende do histórico de edições
+            for trigger in list(touched):
+                touched.update(self.matcher.variants(base, trigger))
+            owners = {}
+            for trigger in touched:
+                for hs in library.find_trigger(trigger):
+                    index = table.index(hs["id"])
+                    if index is not None and self.in_profile(profile, hs):
+                        owners[hs["id"]] = (library.positions[hs["id"]], hs, index)
+            entries = []
+            for _, hs, index in sorted(owners.values(), key=lambda owner: owner[0]):
+                entries.extend((trigger, (trigger, index), table[index].mode) for trigger in hs["triggers"] if trigger in touched)
+            roots[profile] = self.matcher.build(base, added=entries, removed=sorted(touched))
+        return roots
+
+    def search(self, query):
+        # Só espera se a busca vier antes de o índice ficar pronto (logo após o início)
+        self.search_ready.wait()
+        with self.lock:
+            return self._search_index.search(query)
+
+    def build_search_index(self):
+        # Indexa a versão publicada sem segurar o lock; as edições feitas enquanto isso (que
+        # não encontram índice para atualizar) são aplicadas no fim pela diferença
+        library = self.state.library
+        search_index = SearchIndex(library)
+        with self.lock:
+            if self.library is not library:
+                added, removed, changed = diff_hotstrings(library, self.library.all())
+                for hotstring in removed:
+                    search_index.remove(hotstring)
+                for old, new in changed:
+                    search_index.remove(old)
+                    search_index.add(new)
+                for hotstring in added:
+                    search_index.add(hotstring)
+            # O índice de busca é mantido junto com a biblioteca (add/delete/reload) a partir daqui
+            self._search_index = search_index
+        self.search_ready.set()
+
+    def load_hotstrings(self):
+        return self.store.load()
+
+    def save_hotstrings(self):
+        # Reescreve o JSON completo de forma atômica (as edições normais vão para o journal)
+        self.store.compact()
+
+    def watch_config_file(self):
+        while not self.stop_event.wait(WATCH_INTERVAL):
+            try:
+                if self.watcher.changed():
+                    self.reload_hotstrings()
+            except Exception:
+                logger.exception("Error reloading %s", self.config_file)
+
+    def reload_hotstrings(self):
+        # Aplica apenas a diferença entre o arquivo e a biblioteca em memória
+        with self.lock:
+            self.store.flush()
+            try:
+                new_hotstrings = self.store.load()
+            except (ValueError, KeyError) as e:
+                # Arquivo no meio de uma edição externa: tenta de novo na próxima alteração
+                log(logging.WARNING, "Ignoring invalid config file", path=self.config_file, error=str(e))
+                return
+            if self.reload_profiles():
+                log(logging.INFO, "Profiles reloaded", profiles=self.profile_names())
+            added, removed, changed = diff_hotstrings(self.library, new_hotstrings)
+            if not added and not removed and not changed:
+                return
+            self.apply_changes(added=added, removed=removed, changed=changed)
+            if self.store.assigned_ids:
+                self.save_hotstrings()
+        log(logging.INFO, "Reloaded config file", path=self.config_file, added=len(added), removed=len(removed), changed=len(changed))
+
+    def add_hotstring(self, hotstring):
+        # Valida o snippet ou o template antes de salvar (SyntaxError/ValueError para quem chamou)
+        if is_snippet(hotstring["replacement"]):
+            self.snippets.compile(hotstring["replacement"], hotstring.get("cacheTtl", 0))
+        elif is_template(hotstring["replacement"]):
+            Template(hotstring["replacement"])
+        with self.lock:
+            # Registra apenas os triggers da nova hotstring
+            self.apply_changes(added=[hotstring])
+            self.store.append("add", hotstring)
+
+    def import_hotstrings(self, hotstrings):
+        # Importação em massa (ex.: read_ahk): os registros entram um a um na biblioteca, mas o
+        # matcher é atualizado uma única vez e o JSON é regravado uma única vez no fim
+        count = 0
+        with self.lock:
+            state = self.state
+            library = state.library.copy()
+            table = state.table.copy()
+            search_index = self._search_index
+            entries_by_id = {}
+            for hotstring in hotstrings:
+                if library.find_duplicate(hotstring) is not None:
+                    continue
+                library.add(hotstring)
+                if search_index is not None:
+                    search_index.add(hotstring)
+                entries_by_id[hotstring["id"]] = self.hotstring_entries(hotstring, table)
+                count += 1
+            if count:
+                self.publish(library, table, self.build_roots(state.roots, library, table, entries_by_id))
+                self.save_hotstrings()
+        return count
+
+    def delete_hotstrings(self, hotstrings):
+        with self.lock:
+            # Remove pelo id estável e apenas os triggers da hotstring excluída, sem desligar o hook
+            self.apply_changes(removed=hotstrings)
+            # Atualiza o arquivo de configuração
+            for hs in hotstrings:
+                self.store.append("delete", hs)
+
+    def apply_changes(self, added=(), removed=(), changed=()):
+        # Monta uma nova versão (biblioteca, tabela e trie copiadas só onde mudaram) fora da
+        # thread consumidora e a publica numa única troca
+        with self.lock:
+            state = self.state
+            library = state.library.copy()
+            table = state.table.copy()
+            search_index = self._search_index
+            removed_records = []
+            for hs in removed:
+                library.remove(hs["id"])
+                if search_index is not None:
+                    search_index.remove(hs)
+                self.snippets.discard(hs["replacement"], hs.get("cacheTtl", 0))
+                table.remove(hs["id"])
+                removed_records.append(hs)
+            for old, new in changed:
+                library.replace(old["id"], new)
+                if search_index is not None:
+                    search_index.remove(old)
+                    search_index.add(new)
+                self.snippets.discard(old["replacement"], old.get("cacheTtl", 0))
+                removed_records.append(old)
+            for hs in added:
+                library.add(hs)
+                if search_index is not None:
+                    search_index.add(hs)
+
+            entries_by_id = {}
+            for hs in [new for _, new in changed] + list(added):
+                entries_by_id[hs["id"]] = self.hotstring_entries(hs, table)
+            self.publish(library, table, self.build_roots(state.roots, library, table, entries_by_id, removed_records))
+
+    def save_snapshot(self):
+        with self.lock:
+            state = self.state
+            self.snapshot.save({
+                "library": state.library,
+                "snippets": self.snippets,
+                "snippet_errors": self.snippet_errors,
+                "store": (self.store.seq, self.store.journal_size, self.store.profiles),
+                "roots": state.roots,
+                "search_index": self._search_index,
+                "table": state.table,
+            })
+
+    def close(self):
+        # Compacta o journal e atualiza o snapshot para o próximo início ser rápido
+        self.stop_event.set()
+        self.events.stop()
+        self.store.close()
+        self.save_snapshot()
+        self.snippet_pool.shutdown()
+        self.stats.close()
+        self.pacing.save()
+
+    def setup_hotstring_listener(self, library, cached=None):
+        # Remove listeners
+        self.backend.unhook_all()
+
+        # Um único matcher com todos os triggers, alimentado por um único hook de teclado
+        self.matcher = HotstringMatcher()
+
+        if cached is not None:
+            # Tabela e tries dos perfis já compiladas, vindas do snapshot
+            table = cached["table"]
+            roots = cached["roots"]
+        else:
+            # Adicionar hotstrings (cada uma compilada uma vez; as tries dos perfis saem da tabela)
+            table = HotstringTable()
+            for hotstring in library:
+                self.hotstring_entries(hotstring, table)
+            roots = self.build_roots({}, library, table)
+
+        self.state = LibrarySnapshot(library, table, roots, 0)
+        self.matcher.set_root(roots[self.profile])
+        self.backend.hook(self.events.push)
+
+    def hotstring_entries(self, hotstring, table):
+        # Entradas (trigger, (trigger, índice na tabela), modo) de uma hotstring, no formato aceito por matcher.build
+        triggers = hotstring["triggers"]
+        replacement = hotstring["replacement"]
+        prefix = hotstring["prefix"]
+        back_count = hotstring.get("backCount", 0)
+        # if prefix:
+        #     # trigger = prefix + trigger  # Adiciona o prefixo ao trigger
+        #     triggers = [prefix + trigger for trigger in triggers]  # Adiciona o prefixo a cada trigger
+
+        # Compila o snippet uma única vez para todos os triggers da hotstring
+        snippet = None
+        if is_snippet(replacement):
+            try:
+                snippet = self.snippets.compile(replacement, hotstring.get("cacheTtl", 0))
+            except SyntaxError as e:
+                error = f"{', '.join(triggers)}: Erro de sintaxe: {e}"
+                log(logging.WARNING, "Invalid snippet", triggers=triggers, error=str(e))
+                self.snippet_errors.append(error)
+                table.remove(hotstring["id"])
+                return []
+
+        # Templates ({date}, {clipboard}, {cursor}) também são compilados aqui
+        template = None
+        if snippet is None and is_template(replacement):
+            try:
+                template = Template(replacement)
+            except ValueError as e:
+                error = f"{', '.join(triggers)}: Template inválido: {e}"
+                log(logging.WARNING, "Invalid template", triggers=triggers, error=str(e))
+                self.snippet_errors.append(error)
+                table.remove(hotstring["id"])
+                return []
+
+        # Um registro por hotstring, compartilhado por todos os seus triggers
+        index = table.add(hotstring, snippet, template)
+        # Uma linha por hotstring, só em DEBUG e com o replacement truncado
+        log(logging.DEBUG, "Hotstring registered", triggers=triggers, replacement=preview(replacement), backCount=back_count)
+        # Payload com dados simples (sem closures) para a trie poder ir para o snapshot
+        return [(trigger, (trigger, index), table[index].mode) for trigger in triggers]
+
+    def on_key(self, name, event_time):
+        # Thread consumidora do EventPipeline: lê a versão publicada e o perfil ativo sem lock
+        state = self.state
+        root = state.roots.get(self.profile) or state.roots[ALL_PROFILE]
+        if self.matcher.root is not root:
+            # Só esta thread altera o matcher; ele adota a trie da versão/perfil mais recente
+            self.matcher.set_root(root)
+        match = self.matcher.feed(name)
+        if match:
+            self.expand_hotstring(state, *match, self.matcher.typed, self.matcher.end_key)
+
+    def on_overflow(self):
+        # Teclas descartadas pela fila cheia: a palavra atual não é confiável
+        self.matcher.reset()
+
+    def expand_hotstring(self, state, trigger, index, typed=None, end_key="space"):
+        matched_at = time.perf_counter()
+        hotstring = state.table[index]
+        if hotstring is None:
+            # Removida enquanto a palavra era digitada
+            return
+        if typed is None:
+            typed = trigger
+        # Remove o texto digitado com backspace (trigger + tecla final; no modo imediato, só o trigger)
+        trigger_length = len(typed) + (1 if end_key is not None else 0)
+
+        # A tecla final apagada junto com o trigger volta depois do texto (exceto o espaço)
+        end_text = end_key_text(end_key)
+
+        def expand(text, back_count=0):
+            # Sem a opção C/C1, o texto segue a caixa digitada (BTW -> TEXTO, Btw -> Texto)
+            if hotstring.mode.case == CASE_CONFORM:
+                text = conform_case(text, typed, trigger)
+            if back_count:
+                # O cursor também passa de volta pela tecla final
+                back_count += len(end_text)
+            strategy = self.injector.expand(trigger_length, text + end_text, back_count)
+            self.stats.record(hotstring.id, trigger, time.perf_counter() - matched_at, strategy)
+
+        if hotstring.snippet is not None:
+            snippet = hotstring.snippet
+
+            # A thread consumidora apenas enfileira o snippet; o resultado volta para a fila
+            # e é injetado na ordem, pela mesma thread que injeta as demais expansões
+            def inject(result, error):
+                if error is not None:
+                    log(logging.WARNING, "Snippet failed", trigger=trigger, error=str(error))
+                    result = ""
+                expand(result)
+
+            self.snippet_pool.submit(snippet, lambda result, error: self.events.call_soon(inject, result, error))
+        elif hotstring.template is not None:
+            # Render sem interpretador; {cursor} define quantas posições o cursor volta
+            text, back_count = hotstring.template.render()
+            if hotstring.template.cursor is None:
+                back_count = hotstring.back_count
+            expand(text, back_count)
+        else:
+            # Apaga, digita e move o cursor `back_count` vezes num único lote
+            expand(hotstring.replacement, hotstring.back_count)
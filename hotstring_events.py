@@ -0,0 +1,152 @@
+import collections
+import threading
+import time
+
+from hotstring_backend import KEY_DOWN
+from hotstring_injector import batch_key_names
+from hotstring_log import logger
+from hotstring_matcher import MODIFIER_KEYS
+
+
+ECHO_GRACE = 0.1  # Segundos, depois do fim da injeção, em que o eco ainda pode chegar pelo hook
+
+
+class EventPipeline:
+    # Fila entre o hook do sistema e o trabalho de expansão: o callback do hook só enfileira
+    # (nome, instante) e retorna; uma única thread consumidora faz o match e as injeções, na
+    # ordem em que as teclas chegaram. deque.append/popleft são atômicos, sem lock no hook
+    def __init__(self, on_key, on_overflow=None, max_pending=256, echo_timeout=0.5, pacing=None):
+        self.on_key = on_key  # Chamado na thread consumidora com (nome, instante)
+        self.on_overflow = on_overflow  # Chamado quando teclas foram descartadas (palavra incompleta)
+        self.max_pending = max_pending  # Teclas na fila além deste limite são descartadas
+        self.echo_timeout = echo_timeout
+        self.events = collections.deque()
+        self.ready = threading.Event()
+        # Teclas que nós mesmos injetamos e que ainda vão voltar pelo hook (são ignoradas)
+        self.echo = collections.deque()
+        self.echo_deadline = 0
+        # Medição do eco para o PacingController: eventos esperados, recebidos e início do grupo
+        self.pacing = pacing
+        self.echo_sent = 0
+        self.echo_received = 0
+        self.echo_started = 0
+        self.echo_interrupted = False
+        self.overflowed = False
+        self.dropped = 0
+        self.suppressed = 0
+        self.interrupted = 0  # Teclas do usuário recebidas durante o eco de uma injeção
+        self.busy = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.ready.set()
+
+    def push(self, event):
+        # Callback do hook: nada de match, sleep ou injeção aqui
+        if event.event_type != KEY_DOWN:
+            return
+        if self.echo:
+            if time.perf_counter() > self.echo_deadline:
+                self.finish_echo()
+            else:
+                name = event.name.lower() if event.name is not None else None
+                if name is None or name in MODIFIER_KEYS:
+                    # Modificadores (o shift das maiúsculas, o ctrl do ctrl+v) não contam no eco
+                    return
+                if self.match_echo(name):
+                    self.suppressed += 1
+                    self.echo_received += 1
+                    if not self.echo:
+                        self.finish_echo()
+                    return
+                # Fora da ordem esperada: tecla do usuário no meio da injeção. O eco restante
+                # continua esperado até o prazo; a palavra no aplicativo ficou misturada com o
+                # texto injetado, então a tecla não vai ao matcher e ele recomeça depois do eco
+                self.interrupted += 1
+                self.echo_interrupted = True
+                self.overflowed = True
+                return
+        if len(self.events) >= self.max_pending:
+            # Back-pressure: o consumidor está atrasado; descarta e invalida a palavra atual
+            self.dropped += 1
+            self.overflowed = True
+            return
+        if self.overflowed:
+            # A palavra em andamento perdeu teclas: reinicia o matcher exatamente neste ponto
+            self.overflowed = False
+            if self.on_overflow is not None:
+                self.events.append((None, None, (self.on_overflow, ())))
+        self.events.append((event.name, event.time, None))
+        self.ready.set()
+
+    def match_echo(self, name):
+        # Só o próximo evento esperado, exatamente, é tratado como eco
+        try:
+            if self.echo[0] == name:
+                self.echo.popleft()
+                return True
+        except IndexError:
+            pass
+        return False
+
+    def call_soon(self, func, *args):
+        # Trabalho vindo de outras threads (ex.: resultado de snippet) que precisa injetar na ordem
+        self.events.append((None, None, (func, args)))
+        self.ready.set()
+
+    def expect(self, batch):
+        # Registra os eventos que o lote injetado vai gerar (Injector.on_inject)
+        now = time.perf_counter()
+        if self.echo and now > self.echo_deadline:
+            self.finish_echo()
+        if not self.echo_sent:
+            self.echo_started = now
+        names = batch_key_names(batch)
+        self.echo_sent += len(names)
+        self.echo.extend(names)
+        self.echo_deadline = now + self.echo_timeout
+
+    def injected(self):
+        # Fim do envio (Injector.on_injected): o que ainda falta do eco tem só um curto prazo
+        self.echo_deadline = min(self.echo_deadline, time.perf_counter() + ECHO_GRACE)
+
+    def finish_echo(self):
+        # Fim de um grupo de lotes: tudo voltou pelo hook, ou o prazo expirou com eventos perdidos
+        self.echo.clear()
+        # Com teclas do usuário no meio, o que faltou não indica perda do aplicativo
+        if self.pacing is not None and self.echo_sent and not self.echo_interrupted:
+            self.pacing.record_echo(self.echo_sent, self.echo_received, time.perf_counter() - self.echo_started)
+        self.echo_sent = 0
+        self.echo_received = 0
+        self.echo_interrupted = False
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.ready.wait()
+            self.ready.clear()
+            self.busy = True
+            try:
+                while self.events:
+                    name, event_time, call = self.events.popleft()
+                    try:
+                        if call is not None:
+                            call[0](*call[1])
+                        else:
+                            self.on_key(name, event_time)
+                    except Exception:
+                        logger.exception("Error handling keyboard event")
+            finally:
+                self.busy = False
+
+    def wait_idle(self, timeout=1.0):
+        # Espera a fila esvaziar (testes e benchmarks com o FakeKeyboardBackend)
+        deadline = time.perf_counter() + timeout
+        while (self.events or self.busy or self.ready.is_set()) and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        return not self.events and not self.busy
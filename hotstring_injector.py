@@ -0,0 +1,156 @@
+import time
+
+from hotstring_backend import SystemKeyboardBackend
+from hotstring_log import logger
+from hotstring_matcher import MODIFIER_KEYS
+
+try:
+    import pyperclip
+except ImportError:  # Sem pyperclip as expansões são sempre digitadas
+    pyperclip = None
+
+
+# Políticas de pausa entre os segmentos injetados
+PACING_NONE = "none"
+PACING_FIXED = "fixed"
+PACING_ADAPTIVE = "adaptive"
+PACING_POLICIES = (PACING_NONE, PACING_FIXED, PACING_ADAPTIVE)
+
+# Estratégias de injeção do texto de substituição
+STRATEGY_TYPE = "type"
+STRATEGY_PASTE = "paste"
+
+# Nome de tecla reportado pelo hook para caracteres que não são o próprio nome
+CHAR_KEY_NAMES = {" ": "space", "\n": "enter", "\t": "tab", "\b": "backspace"}
+
+
+def batch_key_names(batch):
+    # Nomes (KEY_DOWN) que um lote gera ao voltar pelo hook, na ordem de envio; modificadores
+    # ficam de fora porque cada backend os emite de um jeito (ex.: shift antes das maiúsculas)
+    names = []
+    for kind, content, _ in batch:
+        if kind == "keys":
+            for combo in content.split(", "):
+                names.extend(name for name in combo.split("+") if name not in MODIFIER_KEYS)
+        elif kind == "paste":
+            names.append("v")
+        else:
+            names.extend(CHAR_KEY_NAMES.get(char, char.lower()) for char in content)
+    return names
+
+
+class Injector:
+    # Monta a expansão inteira (apagar trigger, digitar texto, mover o cursor) como um lote
+    # de segmentos e envia cada segmento numa única chamada, sem sleep por tecla
+    def __init__(self, backend=None, pacing=PACING_ADAPTIVE, delay=0.01, per_event_delay=0.001,
+                 paste_threshold=200, clipboard=pyperclip, paste_delay=0.05, controller=None):
+        if pacing not in PACING_POLICIES:
+            raise ValueError(f"Unknown pacing policy: {pacing}")
+        self.backend = backend if backend is not None else SystemKeyboardBackend()
+        self.pacing = pacing
+        self.delay = delay  # Pausa fixa após cada segmento (fixed) ou pausa máxima (adaptive)
+        self.per_event_delay = per_event_delay  # Pausa por evento do segmento (adaptive)
+        # PacingController (opcional, adaptive): pausa por evento e tamanho dos lotes aprendidos pelo eco
+        self.controller = controller
+
+        # Textos com paste_threshold caracteres ou mais são colados via clipboard (ctrl+v)
+        self.paste_threshold = paste_threshold
+        self.clipboard = clipboard
+        self.paste_delay = paste_delay  # Tempo para o aplicativo ler o clipboard antes de restaurá-lo
+        self.last_strategy = None
+        self.on_inject = None  # Recebe cada lote antes do envio (supressão do eco no EventPipeline)
+        self.on_injected = None  # Chamado quando o lote terminou de ser enviado
+
+    def build(self, erase_count, text, back_count):
+        # Lista de segmentos (tipo, conteúdo, número de eventos)
+        batch = []
+        size = self.batch_size() or max(erase_count, len(text), back_count, 1)
+        if erase_count:
+            batch.extend(self.key_segments("backspace", erase_count, size))
+        if text:
+            if self.choose_strategy(text) == STRATEGY_PASTE:
+                batch.append(("paste", text, 1))
+            else:
+                for start in range(0, len(text), size):
+                    chunk = text[start:start + size]
+                    batch.append(("text", chunk, len(chunk)))
+        if back_count:
+            batch.extend(self.key_segments("left", back_count, size))
+        return batch
+
+    def key_segments(self, key, count, size):
+        for start in range(0, count, size):
+            chunk = min(size, count - start)
+            yield ("keys", ", ".join([key] * chunk), chunk)
+
+    def batch_size(self):
+        # Eventos por chamada ao backend: sem limite (None), exceto com o controlador adaptativo
+        if self.pacing == PACING_ADAPTIVE and self.controller is not None:
+            return self.controller.batch_size
+        return None
+
+    def run(self, batch):
+        # Retorna a estratégia efetivamente usada para o texto
+        strategy = STRATEGY_TYPE
+        for kind, content, event_count in batch:
+            if kind == "keys":
+                self.backend.send(content)
+            elif kind == "paste" and self.paste(content):
+                strategy = STRATEGY_PASTE
+            elif kind == "paste":
+                # Clipboard indisponível: o trigger já foi apagado, então o texto é digitado
+                self.backend.write(content)
+                event_count = len(content)
+            else:
+                self.backend.write(content)
+            self.pause(event_count)
+        return strategy
+
+    def expand(self, erase_count, text, back_count=0):
+        # Retorna (e registra em last_strategy) a estratégia usada para o texto
+        batch = self.build(erase_count, text, back_count)
+        if self.on_inject is not None:
+            self.on_inject(batch)
+        try:
+            self.last_strategy = self.run(batch)
+        finally:
+            if self.on_injected is not None:
+                self.on_injected()
+        return self.last_strategy
+
+    def choose_strategy(self, text):
+        if self.clipboard is not None and len(text) >= self.paste_threshold:
+            return STRATEGY_PASTE
+        return STRATEGY_TYPE
+
+    def paste(self, text):
+        # Cola o texto em tempo constante e devolve o conteúdo original do clipboard. Retorna
+        # False sem enviar nada se o clipboard não funciona (ex.: pyperclip sem xclip no Linux)
+        try:
+            saved = self.clipboard.paste()
+        except Exception:
+            saved = None
+        try:
+            self.clipboard.copy(text)
+        except Exception as e:
+            # Não adianta tentar de novo a cada expansão: daqui em diante o texto é digitado
+            logger.warning("Clipboard unavailable, typing replacements instead: %s", e)
+            self.clipboard = None
+            return False
+        self.backend.send("ctrl+v")
+        time.sleep(self.paste_delay)
+        if saved is not None:
+            self.clipboard.copy(saved)
+        return True
+
+    def pause(self, event_count):
+        if self.pacing == PACING_FIXED:
+            time.sleep(self.delay)
+        elif self.pacing == PACING_ADAPTIVE and self.controller is not None:
+            # Ritmo aprendido pelo eco das teclas no aplicativo de destino
+            delay = self.controller.per_event_delay * event_count
+            if delay:
+                time.sleep(delay)
+        elif self.pacing == PACING_ADAPTIVE:
+            # Segmentos curtos quase não esperam; segmentos longos esperam até self.delay
+            time.sleep(min(self.delay, self.per_event_delay * event_count))
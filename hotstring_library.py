@@ -0,0 +1,153 @@
+import uuid
+
+from hotstring_persistent import ChunkedDict, ChunkedList
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+def ensure_id(hotstring):
+    # Registros antigos (ou criados fora do app) recebem um id estável; retorna True se atribuiu
+    if hotstring.get("id"):
+        return False
+    hotstring["id"] = new_id()
+    return True
+
+
+class HotstringLibrary:
+    # Registros indexados pelo id estável, com índices trigger -> ids e categoria -> ids,
+    # para que remover, editar, filtrar por categoria e listar categorias não percorram a biblioteca.
+    # Os contêineres grandes são em blocos (hotstring_persistent): copy() não copia a biblioteca
+    def __init__(self, hotstrings=()):
+        self.records = ChunkedList()  # Registros na ordem de inserção (None onde foram removidos)
+        self.positions = ChunkedDict()  # id -> posição em records
+        self.by_trigger = ChunkedDict()  # trigger -> {id: registro} (dict pequeno, trocado a cada escrita)
+        self.by_category = {}  # categoria -> ChunkedDict id -> posição
+        self.ordered = None  # Lista de registros em cache para a Treeview (refeita após remoções)
+        # Categorias cujo índice esta versão já copiou (as demais são compartilhadas com a versão anterior)
+        self.owned_categories = None
+        for hotstring in hotstrings:
+            self.add(hotstring)
+
+    def copy(self):
+        # Nova versão para edição (copy-on-write): O(blocos) agora, e cada bloco só é copiado
+        # quando alterado; a versão original continua válida para quem a lê
+        library = HotstringLibrary()
+        library.records = self.records.copy()
+        library.positions = self.positions.copy()
+        library.by_trigger = self.by_trigger.copy()
+        library.by_category = dict(self.by_category)
+        library.owned_categories = set()
+        return library
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        return (hotstring for hotstring in self.records if hotstring is not None)
+
+    def __contains__(self, hotstring_id):
+        return hotstring_id in self.positions
+
+    def get(self, hotstring_id):
+        position = self.positions.get(hotstring_id)
+        return self.records[position] if position is not None else None
+
+    def add(self, hotstring):
+        ensure_id(hotstring)
+        if hotstring["id"] in self.positions:
+            self.replace(hotstring["id"], hotstring)
+            return hotstring["id"]
+        position = len(self.records)
+        self.records.append(hotstring)
+        self.positions[hotstring["id"]] = position
+        self._index(hotstring, position)
+        if self.ordered is not None:
+            self.ordered.append(hotstring)
+        return hotstring["id"]
+
+    def remove(self, hotstring_id):
+        position = self.positions.pop(hotstring_id)
+        if position is None:
+            raise KeyError(hotstring_id)
+        hotstring = self.records[position]
+        self.records[position] = None
+        self._unindex(hotstring)
+        self.ordered = None
+        return hotstring
+
+    def replace(self, hotstring_id, hotstring):
+        # Edita mantendo o id e a posição do registro
+        position = self.positions[hotstring_id]
+        old = self.records[position]
+        self._unindex(old)
+        hotstring["id"] = hotstring_id
+        self.records[position] = hotstring
+        self._index(hotstring, position)
+        self.ordered = None
+        return old
+
+    def all(self):
+        if self.ordered is None:
+            self.ordered = [hotstring for hotstring in self.records if hotstring is not None]
+        return self.ordered
+
+    def find_duplicate(self, hotstring):
+        # Registro com os mesmos triggers e a mesma substituição (importações repetidas)
+        for other in self.by_trigger.get(hotstring["triggers"][0], {}).values():
+            if other["triggers"] == hotstring["triggers"] and other["replacement"] == hotstring["replacement"]:
+                return other
+        return None
+
+    def find_trigger(self, trigger):
+        return list(self.by_trigger.get(trigger, {}).values())
+
+    def in_category(self, category):
+        # Na ordem da biblioteca (as posições guardadas no índice)
+        positions = self.by_category.get(category)
+        if not positions:
+            return []
+        return [self.records[position] for position in sorted(positions.values())]
+
+    def categories(self):
+        return list(self.by_category)
+
+    def _category(self, category):
+        # Índice da categoria que pode ser alterado nesta versão (copia o compartilhado na primeira vez)
+        positions = self.by_category.get(category)
+        if positions is None:
+            positions = self.by_category[category] = ChunkedDict()
+        elif self.owned_categories is not None and category not in self.owned_categories:
+            positions = self.by_category[category] = positions.copy()
+        if self.owned_categories is not None:
+            self.owned_categories.add(category)
+        return positions
+
+    def _index(self, hotstring, position):
+        hotstring_id = hotstring["id"]
+        for trigger in hotstring["triggers"]:
+            # Os dicts por trigger nunca são alterados depois de guardados: cada escrita cria outro
+            records = dict(self.by_trigger.get(trigger, {}))
+            records[hotstring_id] = hotstring
+            self.by_trigger[trigger] = records
+        self._category(hotstring["category"])[hotstring_id] = position
+
+    def _unindex(self, hotstring):
+        hotstring_id = hotstring["id"]
+        for trigger in hotstring["triggers"]:
+            records = self.by_trigger.get(trigger)
+            if records is None or hotstring_id not in records:
+                continue
+            records = dict(records)
+            del records[hotstring_id]
+            if records:
+                self.by_trigger[trigger] = records
+            else:
+                self.by_trigger.pop(trigger)
+        category = hotstring["category"]
+        if hotstring_id in self.by_category.get(category, ()):
+            positions = self._category(category)
+            positions.pop(hotstring_id)
+            if not positions:
+                del self.by_category[category]
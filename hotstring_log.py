@@ -0,0 +1,122 @@
+import collections
+import logging
+import os
+import sys
+import threading
+
+
+LOGGER_NAME = "hotstrings"
+DEFAULT_LEVEL = "INFO"  # Registro de triggers e expansões ficam em DEBUG: nada é formatado nem gravado
+PREVIEW_LENGTH = 40  # Caracteres do replacement mostrados nos logs
+FLUSH_INTERVAL = 1.0  # Segundos entre gravações do buffer
+
+logger = logging.getLogger(LOGGER_NAME)
+redact_replacements = False  # True: os logs mostram só o tamanho do replacement
+
+
+def log(level, message, **fields):
+    # Log estruturado (mensagem + campos chave=valor); nada é montado se o nível estiver desligado
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"fields": fields})
+
+
+def preview(text):
+    # Replacement truncado (ou redigido) para os logs
+    if redact_replacements:
+        return f"<{len(text)} chars>"
+    if len(text) <= PREVIEW_LENGTH:
+        return text
+    return f"{text[:PREVIEW_LENGTH]}...(+{len(text) - PREVIEW_LENGTH} chars)"
+
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        message = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return message
+
+
+class RingBufferHandler(logging.Handler):
+    # Registros vão para um buffer circular em memória (os mais antigos são descartados se
+    # ninguém gravar); uma thread de fundo formata e grava em lote, fora do hook e da interface
+    def __init__(self, capacity=1000, stream=None, path=None, interval=FLUSH_INTERVAL):
+        super().__init__()
+        self.buffer = collections.deque(maxlen=capacity)
+        self.stream = stream
+        self.path = path
+        self.interval = interval
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.write_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def emit(self, record):
+        # Só um append (sem I/O); erros são gravados logo na próxima volta da thread
+        self.buffer.append(record)
+        if record.levelno >= logging.ERROR:
+            self.wakeup.set()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def records(self):
+        # Últimos registros ainda em memória (para diagnóstico)
+        return list(self.buffer)
+
+    def flush(self):
+        with self.write_lock:
+            lines = []
+            while self.buffer:
+                try:
+                    record = self.buffer.popleft()
+                except IndexError:
+                    break
+                try:
+                    lines.append(self.format(record))
+                except Exception:
+                    self.handleError(record)
+            if not lines:
+                return
+            text = "\n".join(lines) + "\n"
+            try:
+                if self.stream is not None:
+                    self.stream.write(text)
+                    self.stream.flush()
+                if self.path is not None:
+                    with open(self.path, "a", encoding="utf-8") as file:
+                        file.write(text)
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        self.stop_event.set()
+        self.wakeup.set()
+        self.flush()
+        super().close()
+
+
+def setup_logging(level=None, path=None, stream=sys.stdout, capacity=1000, redact=None):
+    # Nível, arquivo e redação também podem vir de HOTSTRINGS_LOG_LEVEL, HOTSTRINGS_LOG_FILE
+    # e HOTSTRINGS_LOG_REDACT=1
+    global redact_replacements
+    level = level or os.environ.get("HOTSTRINGS_LOG_LEVEL", DEFAULT_LEVEL)
+    path = path or os.environ.get("HOTSTRINGS_LOG_FILE")
+    if redact is None:
+        redact = os.environ.get("HOTSTRINGS_LOG_REDACT") == "1"
+    redact_replacements = redact
+
+    handler = RingBufferHandler(capacity=capacity, stream=stream, path=path)
+    handler.setFormatter(StructuredFormatter())
+    logger.handlers = [handler]
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    return handler
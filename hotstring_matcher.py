@@ -0,0 +1,365 @@
+# Teclas que não alteram a palavra digitada (mesmo conjunto ignorado pelo add_word_listener)
+MODIFIER_KEYS = {
+    'alt', 'alt gr', 'ctrl', 'shift', 'windows',
+    'left alt', 'right alt', 'left ctrl', 'right ctrl',
+    'left shift', 'right shift', 'left windows', 'right windows',
+}
+
+# Caixa do trigger (mesmas opções do AutoHotkey): C exige a grafia exata (padrão dos registros
+# sem "options"); C0 ignora a caixa e a replica no texto; C1 ignora a caixa e mantém o texto
+CASE_SENSITIVE = "C"
+CASE_CONFORM = "C0"
+CASE_INSENSITIVE = "C1"
+
+# Tecla final de quem não define "endChars". O hook não bloqueia a tecla: ela chega ao aplicativo
+# antes dos backspaces, e enter/tab (enviar formulário, trocar de campo) só valem por opção explícita
+DEFAULT_END_KEYS = frozenset(("space",))
+# Separadores de palavra (EndChars padrão do AutoHotkey): começam outra palavra quando não
+# continuam nenhum trigger, então "js.query" continua valendo
+WORD_SEPARATORS = frozenset(("space", "enter", "tab")) | frozenset("-()[]{}':;\"/\\,.?!")
+END_CHAR_KEYS = {" ": "space", "\n": "enter", "\t": "tab"}  # "endChars" -> nome da tecla no hook
+END_KEY_CHARS = {name: char for char, name in END_CHAR_KEYS.items()}
+MAX_WORD = 256  # Caracteres guardados da palavra atual (basta cobrir o maior trigger)
+
+
+def fold(char):
+    # Minúscula do caractere sem mudar o tamanho (a trie anda um nó por tecla)
+    lower = char.lower()
+    return lower if len(lower) == 1 else char
+
+
+def upper(char):
+    result = char.upper()
+    return result if len(result) == 1 else char
+
+
+def conform_case(text, typed, trigger):
+    # Replica no texto a caixa digitada: TUDO MAIÚSCULO ou Primeira maiúscula. Digitado
+    # exatamente como o trigger, o texto sai como foi cadastrado
+    if typed == trigger:
+        return text
+    letters = [char for char in typed if char.isalpha()]
+    if not letters:
+        return text
+    if len(letters) > 1 and all(char.isupper() for char in letters):
+        return "".join(map(upper, text))
+    if letters[0].isupper():
+        for i, char in enumerate(text):
+            if char.isalpha():
+                return text[:i] + upper(char) + text[i + 1:]
+    return text
+
+
+class TriggerMode:
+    # Como um trigger dispara: caixa, teclas finais, imediato (*) e sufixo (?). Uma instância
+    # por combinação de opções, compartilhada por todas as hotstrings que a usam
+    __slots__ = ('case', 'end_keys', 'immediate', 'suffix')
+    instances = {}
+
+    def __init__(self, case, end_keys, immediate, suffix):
+        self.case = case
+        self.end_keys = end_keys
+        self.immediate = immediate
+        self.suffix = suffix
+
+    @classmethod
+    def get(cls, case=CASE_SENSITIVE, end_keys=DEFAULT_END_KEYS, immediate=False, suffix=False):
+        key = (case, frozenset(end_keys), immediate, suffix)
+        mode = cls.instances.get(key)
+        if mode is None:
+            mode = cls.instances[key] = cls(*key)
+        return mode
+
+    def fires(self, key):
+        # key: tecla final digitada, ou None quando o último caractere do trigger acabou de entrar
+        if key is None:
+            return self.immediate
+        return not self.immediate and key in self.end_keys
+
+
+def parse_options(options):
+    # Separa as opções do AutoHotkey (C1, *0, ?0... têm duas letras)
+    parsed = []
+    index = 0
+    while index < len(options):
+        if options[index].upper() in "CBKPSZ*?" and index + 1 < len(options) and (options[index + 1].isdigit() or options[index + 1] == "-"):
+            end = index + 1
+            while end < len(options) and (options[end].isdigit() or options[end] == "-"):
+                end += 1
+            parsed.append(options[index:end])
+            index = end
+        else:
+            parsed.append(options[index])
+            index += 1
+    return parsed
+
+
+def trigger_mode(hotstring):
+    # Como o trigger dispara: "options" (C/C0/C1, * imediato, ? sufixo; como no AutoHotkey, a
+    # última ocorrência vale) e "endChars" (caracteres que completam o trigger). Sem opção de
+    # caixa, o trigger é exato, como sempre foi no gerenciador
+    case = CASE_SENSITIVE
+    immediate = suffix = False
+    for option in parse_options(hotstring.get("options") or ""):
+        option = option.upper()
+        if option in (CASE_SENSITIVE, CASE_CONFORM, CASE_INSENSITIVE):
+            case = option
+        elif option in ("*", "*0"):
+            immediate = option == "*"
+        elif option in ("?", "?0"):
+            suffix = option == "?"
+    end_chars = hotstring.get("endChars")
+    end_keys = DEFAULT_END_KEYS if end_chars is None else [END_CHAR_KEYS.get(char, char) for char in end_chars]
+    return TriggerMode.get(case, end_keys, immediate, suffix)
+
+
+def end_key_text(end_key):
+    # Texto que devolve a tecla final depois da expansão (como no AutoHotkey): pontuação, enter
+    # e tab são digitados de novo; o espaço é consumido, como sempre foi no gerenciador
+    if end_key is None or end_key == "space":
+        return ""
+    return END_KEY_CHARS.get(end_key, end_key)
+
+
+class TrieNode:
+    # entries: trigger exato -> (payload, modo), só nos nós onde algum trigger termina. Os
+    # caminhos usam os caracteres em minúscula, então variantes de caixa dividem o mesmo nó
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = None
+
+
+class TrieRoot(TrieNode):
+    # A raiz também guarda a trie dos triggers com ?, com os caracteres invertidos: o fim da
+    # palavra digitada é percorrido de trás para frente
+    __slots__ = ('suffixes',)
+
+    def __init__(self):
+        super().__init__()
+        self.suffixes = TrieNode()
+
+    def __reduce__(self):
+        # O snapshot grava a trie achatada: o pickle recursivo de nós aninhados estoura o limite
+        # de recursão com triggers longos (um nível por caractere)
+        return (load_trie, (flatten_trie(self),))
+
+
+def flatten_trie(root):
+    # Nós em ordem de visita (0 = raiz, 1 = trie de sufixos), com os filhos como índices
+    nodes = [root, root.suffixes]
+    seen = {id(root): 0, id(root.suffixes): 1}
+    flat = []
+    for node in nodes:  # A lista cresce durante a visita
+        children = []
+        for char, child in node.children.items():
+            index = seen.get(id(child))
+            if index is None:
+                index = seen[id(child)] = len(nodes)
+                nodes.append(child)
+            children.append((char, index))
+        flat.append((node.entries, children))
+    return flat
+
+
+def load_trie(flat):
+    nodes = [TrieRoot()] + [TrieNode() for _ in range(len(flat) - 1)]
+    for node, (entries, children) in zip(nodes, flat):
+        node.entries = entries
+        node.children = {char: nodes[index] for char, index in children}
+    nodes[0].suffixes = nodes[1]
+    return nodes[0]
+
+
+class HotstringMatcher:
+    # Um único autômato (trie) com todos os triggers: cada tecla custa um lookup em dict,
+    # independente de quantas hotstrings estão carregadas
+    def __init__(self, separators=WORD_SEPARATORS):
+        self.separators = frozenset(separators)
+        self.root = TrieRoot()
+        self.node = self.root
+        self.word = []  # Caracteres digitados desde o início da palavra (com a caixa original)
+        self.typed = None  # Palavra digitada que completou o último trigger retornado
+        self.end_key = None  # Tecla final do último trigger retornado (None no modo imediato)
+
+    def update(self, added=(), removed=()):
+        # Aplica as alterações numa cópia dos caminhos afetados (path copying) e publica
+        # a nova raiz com uma única atribuição: o custo é O(triggers alterados) e o hook
+        # nunca enxerga uma trie pela metade
+        self.set_root(self.build(self.root, added, removed))
+
+    def build(self, base, added=(), removed=()):
+        # Nova raiz com as alterações aplicadas sobre `base`, sem publicá-la
+        root = self._copy_node(base)
+        root.suffixes = self._copy_node(base.suffixes)
+        fresh = {id(root), id(root.suffixes)}
+
+        for trigger in removed:
+            key = "".join(map(fold, trigger))
+            # O modo do trigger removido não é conhecido aqui: sai das duas tries
+            self._remove(root, key, trigger, fresh)
+            self._remove(root.suffixes, key[::-1], trigger, fresh)
+
+        for trigger, payload, mode in added:
+            # Se o trigger já existir, o último registrado vence
+            key = "".join(map(fold, trigger))
+            start = root
+            if mode.suffix:
+                start, key = root.suffixes, key[::-1]
+            node = self._copy_path(start, key, fresh, create=True)[-1]
+            entries = dict(node.entries or ())
+            entries.pop(trigger, None)
+            entries[trigger] = (payload, mode)
+            node.entries = entries
+        return root
+
+    def variants(self, root, trigger):
+        # Triggers (em qualquer caixa) guardados no mesmo nó que `trigger`, nas duas tries
+        key = "".join(map(fold, trigger))
+        found = []
+        for node, path in ((root, key), (root.suffixes, key[::-1])):
+            for char in path:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            else:
+                found.extend(node.entries or ())
+        return found
+
+    def _remove(self, start, key, trigger, fresh):
+        path = self._copy_path(start, key, fresh, create=False)
+        if path is None or trigger not in (path[-1].entries or ()):
+            return
+        # Os dicts de entries nunca são alterados depois de publicados: cada mudança cria outro
+        entries = dict(path[-1].entries)
+        del entries[trigger]
+        path[-1].entries = entries or None
+        # Poda os nós que ficaram vazios
+        for i in range(len(key) - 1, -1, -1):
+            node = path[i + 1]
+            if node.children or node.entries is not None:
+                break
+            del path[i].children[key[i]]
+
+    def set_root(self, root):
+        old_root = self.root
+        self.root = root
+        # Quem está no início de uma palavra passa a usar a nova trie; uma palavra já
+        # em andamento termina na trie antiga
+        if self.node is old_root:
+            self.node = root
+
+    def _copy_node(self, node):
+        copy = type(node)()
+        copy.children = dict(node.children)
+        copy.entries = node.entries
+        return copy
+
+    def _copy_path(self, root, trigger, fresh, create):
+        # Retorna a lista de nós (já copiados) do caminho do trigger
+        path = [root]
+        node = root
+        for char in trigger:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = TrieNode()
+            elif id(child) in fresh:
+                node = child
+                path.append(node)
+                continue
+            else:
+                child = self._copy_node(child)
+            fresh.add(id(child))
+            node.children[char] = child
+            node = child
+            path.append(node)
+        return path
+
+    def add(self, trigger, payload, mode=None):
+        self.update(added=[(trigger, payload, mode or TriggerMode.get())])
+
+    def remove(self, trigger):
+        self.update(removed=[trigger])
+
+    def replace(self, old_triggers, entries):
+        self.update(added=entries, removed=old_triggers)
+
+    def reset(self):
+        self.node = self.root
+        self.word = []
+
+    def select(self, entries, typed, key):
+        # Grafia exata vale em qualquer modo; senão, o último trigger que ignora a caixa
+        entry = entries.get(typed)
+        if entry is not None and entry[1].fires(key):
+            return entry[0]
+        for payload, mode in reversed(list(entries.values())):
+            if mode.case != CASE_SENSITIVE and mode.fires(key):
+                return payload
+        return None
+
+    def match(self, node, key):
+        # Trigger que termina no nó atual ou, com ?, no fim da palavra; registra em
+        # typed/end_key o que a expansão precisa apagar
+        payload = None
+        if node is not None and node.entries is not None:
+            typed = "".join(self.word)
+            payload = self.select(node.entries, typed, key)
+        if payload is None and self.root.suffixes.children:
+            payload, typed = self.match_suffix(key)
+        if payload is not None:
+            self.typed = typed
+            self.end_key = key
+        return payload
+
+    def match_suffix(self, key):
+        # Percorre a palavra de trás para frente na trie invertida; o sufixo mais longo vence
+        found = (None, None)
+        node = self.root.suffixes
+        word = self.word
+        for length in range(1, len(word) + 1):
+            node = node.children.get(fold(word[-length]))
+            if node is None:
+                break
+            if node.entries is not None:
+                typed = "".join(word[-length:])
+                payload = self.select(node.entries, typed, key)
+                if payload is not None:
+                    found = (payload, typed)
+        return found
+
+    def feed(self, name):
+        # Processa uma tecla (event.name) e retorna o payload quando um trigger dispara
+        if name is None or name in MODIFIER_KEYS:
+            return None
+
+        # Tecla final de algum trigger completo (espaço, enter, pontuação...)
+        match = self.match(self.node, name)
+        if match is not None:
+            self.reset()
+            return match
+
+        if len(name) > 1:
+            # Teclas especiais (backspace, setas...) descartam a palavra atual
+            self.reset()
+            return None
+
+        node = self.node
+        child = node.children.get(fold(name)) if node is not None else None
+        if child is None and name in self.separators:
+            # Separador que não continua nenhum trigger: começa outra palavra
+            self.reset()
+            return None
+        self.node = child
+        self.word.append(name)
+        if len(self.word) > MAX_WORD:
+            del self.word[0]
+
+        # Modo imediato (*): dispara assim que o último caractere do trigger é digitado
+        match = self.match(child, None)
+        if match is not None:
+            self.reset()
+        return match
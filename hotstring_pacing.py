@@ -0,0 +1,75 @@
+import json
+import os
+
+
+PACING_FILE = "hotstrings.pacing.json"
+
+
+def session_name():
+    # No Windows, SESSIONNAME distingue o console ("Console") de sessões remotas ("RDP-Tcp#3")
+    return os.environ.get("SESSIONNAME") or "default"
+
+
+class PacingController:
+    # Ajusta a pausa por evento e o tamanho dos lotes do Injector pelo eco das teclas injetadas:
+    # lote que volta inteiro pelo hook acelera (pausa menor, lote maior); lote que perde eventos
+    # desacelera. Os valores aprendidos ficam salvos por sessão
+    def __init__(self, path=PACING_FILE, session=None, per_event_delay=0.001, batch_size=64,
+                 min_delay=0.0, max_delay=0.05, min_batch=4, max_batch=512):
+        self.path = path
+        self.session = session or session_name()
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.per_event_delay = per_event_delay
+        self.batch_size = batch_size
+        self.accepted = 0
+        self.rejected = 0
+        self.echo_latency = None  # Média móvel do tempo de eco por evento (s)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                settings = json.load(file)[self.session]
+            self.per_event_delay = min(self.max_delay, max(self.min_delay, float(settings["perEventDelay"])))
+            self.batch_size = min(self.max_batch, max(self.min_batch, int(settings["batchSize"])))
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+
+    def save(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        data[self.session] = {"perEventDelay": self.per_event_delay, "batchSize": self.batch_size}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file, indent=4)
+        os.replace(temp_path, self.path)
+
+    def record_echo(self, sent, received, elapsed):
+        # Chamado pelo EventPipeline quando o eco de um grupo de lotes termina (ou expira)
+        if not received:
+            # Backend que não devolve as teclas injetadas: nada a medir
+            return
+        if received < sent:
+            # O aplicativo perdeu eventos: desacelera rápido
+            self.rejected += 1
+            self.per_event_delay = min(self.max_delay, max(self.per_event_delay * 2, 0.001))
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+            return
+        self.accepted += 1
+        echo_delay = elapsed / sent
+        if self.echo_latency is None:
+            self.echo_latency = echo_delay
+        else:
+            self.echo_latency = self.echo_latency * 0.8 + echo_delay * 0.2
+        if echo_delay > self.per_event_delay * 2 + 0.001:
+            # Tudo aceito, mas o eco está bem mais lento que o ritmo de envio: mantém
+            return
+        # Tudo aceito e o eco acompanha: acelera devagar
+        self.per_event_delay = max(self.min_delay, self.per_event_delay * 0.8)
+        self.batch_size = min(self.max_batch, self.batch_size + 8)
@@ -0,0 +1,132 @@
+# Estruturas com cópia barata para as versões publicadas (LibrarySnapshot): copy() copia só a
+# lista de blocos e cada bloco é copiado na primeira escrita da nova versão, então uma edição
+# custa O(blocos + tamanho do bloco) e não O(biblioteca). Depois de copy(), a versão de origem
+# não deve mais ser alterada (ela passa a compartilhar os blocos com a cópia)
+CHUNK_BITS = 8
+CHUNK_SIZE = 1 << CHUNK_BITS
+BUCKETS = 256
+
+
+class ChunkedList:
+    # Lista só de acréscimo (posições nunca mudam), em blocos de CHUNK_SIZE itens
+    __slots__ = ("chunks", "owned", "length")
+
+    def __init__(self, items=()):
+        self.chunks = []
+        self.owned = None  # Índices dos blocos que esta versão pode alterar (None: todos)
+        self.length = 0
+        for item in items:
+            self.append(item)
+
+    def copy(self):
+        copy = ChunkedList()
+        copy.chunks = list(self.chunks)
+        copy.owned = set()
+        copy.length = self.length
+        self.owned = set()
+        return copy
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield from chunk
+
+    def __getitem__(self, index):
+        if index < 0 or index >= self.length:
+            raise IndexError(index)
+        return self.chunks[index >> CHUNK_BITS][index & (CHUNK_SIZE - 1)]
+
+    def __setitem__(self, index, value):
+        if index < 0 or index >= self.length:
+            raise IndexError(index)
+        self._own(index >> CHUNK_BITS)[index & (CHUNK_SIZE - 1)] = value
+
+    def append(self, value):
+        if self.length & (CHUNK_SIZE - 1) == 0:
+            self.chunks.append([])
+            if self.owned is not None:
+                self.owned.add(len(self.chunks) - 1)
+        self._own(len(self.chunks) - 1).append(value)
+        self.length += 1
+
+    def _own(self, number):
+        if self.owned is None or number in self.owned:
+            return self.chunks[number]
+        chunk = self.chunks[number] = list(self.chunks[number])
+        self.owned.add(number)
+        return chunk
+
+
+class ChunkedDict:
+    # dict dividido em BUCKETS dicts pelo hash da chave. A ordem de iteração segue os buckets,
+    # não a inserção: quem precisa de ordem guarda a posição (ChunkedList) como valor
+    __slots__ = ("buckets", "owned", "length")
+
+    def __init__(self):
+        self.buckets = [{} for _ in range(BUCKETS)]
+        self.owned = None
+        self.length = 0
+
+    def copy(self):
+        copy = ChunkedDict.__new__(ChunkedDict)
+        copy.buckets = list(self.buckets)
+        copy.owned = set()
+        copy.length = self.length
+        self.owned = set()
+        return copy
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        return self.length > 0
+
+    def __contains__(self, key):
+        return key in self.buckets[hash(key) % BUCKETS]
+
+    def __getitem__(self, key):
+        return self.buckets[hash(key) % BUCKETS][key]
+
+    def get(self, key, default=None):
+        return self.buckets[hash(key) % BUCKETS].get(key, default)
+
+    def __setitem__(self, key, value):
+        bucket = self._own(hash(key) % BUCKETS)
+        if key not in bucket:
+            self.length += 1
+        bucket[key] = value
+
+    def pop(self, key, default=None):
+        number = hash(key) % BUCKETS
+        if key not in self.buckets[number]:
+            return default
+        self.length -= 1
+        return self._own(number).pop(key)
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            yield from bucket
+
+    def __getstate__(self):
+        # hash() de str muda a cada processo: o snapshot guarda os pares e redistribui ao carregar
+        return ([(key, value) for bucket in self.buckets for key, value in bucket.items()],)
+
+    def __setstate__(self, state):
+        self.buckets = [{} for _ in range(BUCKETS)]
+        self.owned = None
+        self.length = 0
+        for key, value in state[0]:
+            self[key] = value
+
+    def values(self):
+        for bucket in self.buckets:
+            yield from bucket.values()
+
+    def _own(self, number):
+        if self.owned is None or number in self.owned:
+            return self.buckets[number]
+        bucket = self.buckets[number] = dict(self.buckets[number])
+        self.owned.add(number)
+        return bucket
@@ -0,0 +1,201 @@
+import bisect
+import heapq
+import itertools
+
+
+GRAM_SIZE = 3
+# Preenchimento no fim do texto: todo n-grama menor vira prefixo de algum trigrama
+PADDING = "\0" * (GRAM_SIZE - 1)
+# Consultas curtas com mais registros que isso são percorridas na ordem, sem unir as listas
+SCAN_THRESHOLD = 1000
+LAST_CHAR = "\U0010ffff"
+
+
+def record_text(hotstring):
+    return "\n".join([", ".join(hotstring["triggers"]), hotstring["replacement"], hotstring["category"]]).lower()
+
+
+def trigrams(text):
+    text += PADDING
+    return {text[start:start + GRAM_SIZE] for start in range(len(text) - GRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    # Índice invertido de trigramas sobre triggers, replacement e categoria. Uma busca intersecta
+    # as listas dos trigramas da consulta e só confere a substring nos candidatos
+    def __init__(self, hotstrings=()):
+        self.postings = {}  # trigrama -> conjunto de ids
+        self.prefixes = {}  # prefixo de 1 ou 2 caracteres -> trigramas que começam com ele
+        self.counts = {}  # consulta de 1 ou 2 caracteres -> número de registros que a contêm (sob demanda)
+        self.records = {}  # id -> registro (na ordem de inserção)
+        self.texts = {}  # id -> texto indexado (minúsculo)
+        self.triggers = {}  # id -> triggers em minúsculas, um por linha (ranking)
+        self.order = {}  # id -> ordem de inserção (desempate do ranking)
+        self.next_order = 0
+        # (trigger, ordem, id) em ordem alfabética: os triggers com um prefixo formam uma faixa
+        self.sorted_triggers = []
+        for hotstring in hotstrings:
+            self.sorted_triggers.extend(self.index(hotstring))
+        self.sorted_triggers.sort()
+
+    def add(self, hotstring):
+        for entry in self.index(hotstring):
+            bisect.insort(self.sorted_triggers, entry)
+
+    def index(self, hotstring):
+        key = hotstring["id"]
+        text = record_text(hotstring)
+        triggers = [trigger.lower() for trigger in hotstring["triggers"]]
+        order = self.next_order
+        self.next_order += 1
+        self.records[key] = hotstring
+        self.texts[key] = text
+        self.triggers[key] = "\n".join(triggers)
+        self.order[key] = order
+        for gram in trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = set()
+                for size in range(1, GRAM_SIZE):
+                    self.prefixes.setdefault(gram[:size], set()).add(gram)
+            posting.add(key)
+        for gram in self.counts:
+            if gram in text:
+                self.counts[gram] += 1
+        return [(trigger, order, key) for trigger in triggers]
+
+    def remove(self, hotstring):
+        key = hotstring["id"]
+        if key not in self.records:
+            return
+        del self.records[key]
+        order = self.order.pop(key)
+        for trigger in self.triggers.pop(key).split("\n"):
+            position = bisect.bisect_left(self.sorted_triggers, (trigger, order, key))
+            del self.sorted_triggers[position]
+        text = self.texts.pop(key)
+        for gram in trigrams(text):
+            posting = self.postings[gram]
+            posting.discard(key)
+            if not posting:
+                del self.postings[gram]
+                for size in range(1, GRAM_SIZE):
+                    prefix = self.prefixes[gram[:size]]
+                    prefix.discard(gram)
+                    if not prefix:
+                        del self.prefixes[gram[:size]]
+        for gram in self.counts:
+            if gram in text:
+                self.counts[gram] -= 1
+
+    def search(self, query):
+        # Retorna os registros que contêm a consulta (sem diferenciar maiúsculas), ordenados por
+        # relevância. O resultado é preguiçoso: len() é imediato e cada fatia pedida pela lista
+        # virtual só ordena os registros até ela, em vez de ordenar todos os candidatos
+        query = query.lower()
+        if not query:
+            return list(self.records.values())
+
+        if len(query) < GRAM_SIZE:
+            count = self.count(query)
+            if count > SCAN_THRESHOLD:
+                # Consulta muito comum: os registros são conferidos na ordem, só até encher a fatia
+                return SearchResults(count, self.ranked(query, None))
+            candidates = set()
+            for gram in self.prefixes.get(query, ()):
+                candidates.update(self.postings[gram])
+        else:
+            postings = []
+            for start in range(len(query) - GRAM_SIZE + 1):
+                posting = self.postings.get(query[start:start + GRAM_SIZE])
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            if len(query) > GRAM_SIZE:
+                # Os trigramas não garantem a ordem: confere a substring
+                texts = self.texts
+                candidates = {key for key in candidates if query in texts[key]}
+        return SearchResults(len(candidates), self.ranked(query, candidates))
+
+    def count(self, query):
+        # Registros que contêm uma consulta curta: contado na primeira vez e mantido por add/remove
+        count = self.counts.get(query)
+        if count is None:
+            count = self.counts[query] = sum(1 for text in self.texts.values() if query in text)
+        return count
+
+    def ranked(self, query, candidates):
+        # Registros na ordem do ranking: trigger exato < prefixo de trigger < trigger contém <
+        # categoria/replacement, cada grupo na ordem de inserção. Os dois primeiros grupos são a
+        # faixa da consulta em sorted_triggers; os outros saem dos candidatos. O que depende do
+        # estado do índice é calculado aqui, e edições posteriores não afetam o gerador
+        start = bisect.bisect_left(self.sorted_triggers, (query,))
+        end = bisect.bisect_left(self.sorted_triggers, (query + LAST_CHAR,))
+        prefixed = self.sorted_triggers[start:end]
+        exact = [key for trigger, _, key in prefixed if trigger == query]
+        # Heap pela ordem de inserção: cada fatia retira só os registros que mostra
+        heap = [(order, key) for trigger, order, key in prefixed if trigger != query]
+        heapq.heapify(heap)
+        prefix = (heapq.heappop(heap)[1] for _ in range(len(heap)))
+        seen = {key for _, _, key in prefixed}
+        records = self.records
+        texts = self.texts
+        triggers = self.triggers
+        order = self.order
+
+        def scan(select):
+            # Registros na ordem de inserção (desempate dentro do grupo); as chaves só são copiadas
+            # quando a fatia pedida chega a este grupo
+            for key in list(texts):
+                if select(key):
+                    yield key
+
+        if candidates is None:
+            # Consulta comum: os registros são conferidos na ordem, só até encher a fatia pedida
+            contains = scan(lambda key: key not in seen and query in triggers.get(key, ""))
+            others = scan(lambda key: key not in seen and query in texts.get(key, "")
+                          and query not in triggers.get(key, ""))
+        else:
+            contains = sorted((key for key in candidates if key not in seen and query in triggers[key]),
+                              key=order.__getitem__)
+            seen.update(contains)
+            if len(candidates) > SCAN_THRESHOLD:
+                others = scan(lambda key: key in candidates and key not in seen)
+            else:
+                others = sorted((key for key in candidates if key not in seen), key=order.__getitem__)
+
+        def unique(keys):
+            # Um registro com vários triggers aparece uma vez, no melhor grupo
+            shown = set()
+            for key in keys:
+                record = records.get(key)
+                if record is not None and key not in shown:
+                    shown.add(key)
+                    yield record
+
+        return unique(itertools.chain(exact, prefix, contains, others))
+
+
+class SearchResults:
+    # Sequência de resultados ordenada sob demanda: len() e fatias, como a lista virtual usa
+    def __init__(self, count, pending):
+        self.count = count
+        self.pending = pending
+        self.ranked = []
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            stop = item.stop if item.stop is not None and item.stop >= 0 else self.count
+        else:
+            stop = item + 1 if item >= 0 else self.count
+        if len(self.ranked) < stop:
+            self.ranked.extend(itertools.islice(self.pending, stop - len(self.ranked)))
+        return self.ranked[item]
+
+    def __iter__(self):
+        return iter(self[:])
@@ -0,0 +1,184 @@
+import marshal
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Replacements com este prefixo são código Python que define a variável `result`
+SNIPPET_PREFIX = "python "
+NO_RESULT = "Nenhum resultado encontrado."
+
+
+def is_snippet(replacement):
+    return replacement.startswith(SNIPPET_PREFIX)
+
+
+class Snippet:
+    # Código do snippet compilado uma única vez; run() só executa o code object
+    def __init__(self, source, ttl=0):
+        self.source = source
+        self.code = compile(source, "<hotstring>", "exec")  # SyntaxError aqui, no carregamento
+        self.ttl = ttl  # Segundos durante os quais o último resultado é reaproveitado (0 = sem cache)
+        self.cached_result = None
+        self.cached_at = 0
+
+    def __getstate__(self):
+        # Code objects não são serializáveis via pickle; usa marshal (snapshot da biblioteca)
+        return {"source": self.source, "code": marshal.dumps(self.code), "ttl": self.ttl}
+
+    def __setstate__(self, state):
+        self.source = state["source"]
+        self.code = marshal.loads(state["code"])
+        self.ttl = state["ttl"]
+        self.cached_result = None
+        self.cached_at = 0
+
+    def run(self):
+        now = time.monotonic()
+        if self.ttl and self.cached_result is not None and now - self.cached_at < self.ttl:
+            return self.cached_result
+
+        result = execute(self.code)
+        if self.ttl:
+            self.cached_result = result
+            self.cached_at = now
+        return result
+
+
+def execute(code):
+    exec_globals = {}
+    exec_locals = {}
+    exec(code, exec_globals, exec_locals)
+    return str(exec_locals.get('result', NO_RESULT))
+
+
+# Cache de snippets de cada processo do pool (source -> Snippet)
+_process_snippets = {}
+
+
+def _run_in_process(source, ttl):
+    snippet = _process_snippets.get((source, ttl))
+    if snippet is None:
+        snippet = _process_snippets[(source, ttl)] = Snippet(source, ttl)
+    return snippet.run()
+
+
+class SnippetTask:
+    # Estado de uma execução: o resultado é entregue uma única vez (sucesso, erro ou timeout)
+    def __init__(self, on_done):
+        self.on_done = on_done
+        self.lock = threading.Lock()
+        self.done = False
+        self.future = None
+        self.timer = None
+        self.pool = None  # Pool em que o snippet foi enviado
+
+    def finish(self, result, error):
+        with self.lock:
+            if self.done:
+                return False
+            self.done = True
+        if self.timer is not None:
+            self.timer.cancel()
+        self.on_done(result, error)
+        return True
+
+
+class SnippetPool:
+    # Executa os snippets fora da thread do hook, num pool limitado de processos (ou de threads,
+    # sem isolamento: uma thread que excede o timeout não pode ser interrompida e segue ocupando
+    # o worker), com timeout por snippet
+    def __init__(self, workers=2, timeout=2.0, max_pending=16, processes=True):
+        self.workers = workers
+        self.timeout = timeout
+        self.processes = processes
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.pool = None  # Criado no primeiro snippet: bibliotecas sem snippets não iniciam processos
+
+    def create_pool(self):
+        if self.processes:
+            return multiprocessing.Pool(self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="snippet")
+
+    def submit(self, snippet, on_done):
+        # Chamado na thread do hook: apenas enfileira. on_done(result, error) roda numa thread do pool
+        if not self.pending.acquire(blocking=False):
+            on_done(None, RuntimeError("Snippet pool is busy"))
+            return None
+
+        task = SnippetTask(lambda result, error: self._release(on_done, result, error))
+        task.timer = threading.Timer(self.timeout, self.expire, args=(task,))
+        task.timer.daemon = True
+
+        with self.lock:
+            if self.pool is None:
+                self.pool = self.create_pool()
+            task.pool = self.pool
+            if self.processes:
+                task.future = self.pool.apply_async(
+                    _run_in_process, (snippet.source, snippet.ttl),
+                    callback=lambda result: task.finish(result, None),
+                    error_callback=lambda error: task.finish(None, error),
+                )
+            else:
+                task.future = self.pool.submit(snippet.run)
+                task.future.add_done_callback(lambda future: self._future_done(task, future))
+        # Só depois de task.future existir: expire() pode precisar cancelá-lo
+        task.timer.start()
+        return task
+
+    def _future_done(self, task, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        task.finish(None if error else future.result(), error)
+
+    def _release(self, on_done, result, error):
+        self.pending.release()
+        on_done(result, error)
+
+    def expire(self, task):
+        if not task.finish(None, TimeoutError(f"Snippet excedeu {self.timeout}s")):
+            return
+        if self.processes:
+            # Um processo travado só pode ser cancelado encerrando o pool; as outras
+            # execuções em andamento nele também expiram. Se o pool já foi trocado por outro
+            # timeout, o processo do snippet já foi encerrado e o pool novo fica intacto
+            with self.lock:
+                if self.pool is task.pool:
+                    self.pool.terminate()
+                    self.pool = self.create_pool()
+        else:
+            # Threads não podem ser interrompidas: cancela se ainda não começou, senão o resultado é descartado
+            task.future.cancel()
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is None:
+                return
+            if self.processes:
+                self.pool.terminate()
+            else:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SnippetCache:
+    # Snippets compilados, indexados pelo texto do replacement (hotstrings iguais compartilham o code object)
+    def __init__(self):
+        self.snippets = {}
+
+    def compile(self, replacement, ttl=0):
+        key = (replacement, ttl)
+        snippet = self.snippets.get(key)
+        if snippet is None:
+            snippet = Snippet(replacement[len(SNIPPET_PREFIX):], ttl)
+            self.snippets[key] = snippet
+        return snippet
+
+    def get(self, replacement, ttl=0):
+        return self.snippets.get((replacement, ttl))
+
+    def discard(self, replacement, ttl=0):
+        self.snippets.pop((replacement, ttl), None)
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from hotstring_log import logger
+
+
+STATS_FILE = "hotstrings.stats.json"
+FLUSH_INTERVAL = 5.0  # Segundos entre gravações do arquivo de estatísticas
+# Limites (ms) dos baldes do histograma de latência; o último balde recebe o que passar de 1s
+LATENCY_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+
+class UsageStats:
+    # Contadores por hotstring (disparos, latência do match até o fim da injeção e estratégia usada).
+    # Cada thread grava num buffer próprio, sem lock; uma thread de fundo agrega os buffers e
+    # grava o arquivo de estatísticas periodicamente
+    def __init__(self, path=STATS_FILE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.local = threading.local()
+        self.buffers = []
+        self.buffers_lock = threading.Lock()  # Só usado quando uma thread cria o seu buffer
+        self.flush_lock = threading.Lock()
+        self.totals = self.load()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)["hotstrings"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return {}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error("Error saving %s: %s", self.path, e)
+
+    def record(self, hotstring_id, trigger, latency, strategy):
+        # Chamado na thread do hook/injeção: apenas um append no buffer da thread
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            buffer = self.local.buffer = []
+            with self.buffers_lock:
+                self.buffers.append(buffer)
+        buffer.append((hotstring_id, trigger, latency, strategy, time.time()))
+
+    def drain(self):
+        events = []
+        with self.buffers_lock:
+            buffers = list(self.buffers)
+        for buffer in buffers:
+            # Copia e remove só o que foi copiado; appends concorrentes ficam para a próxima vez
+            count = len(buffer)
+            events.extend(buffer[:count])
+            del buffer[:count]
+        return events
+
+    def flush(self):
+        with self.flush_lock:
+            events = self.drain()
+            if not events:
+                return
+            for hotstring_id, trigger, latency, strategy, when in events:
+                entry = self.totals.get(hotstring_id)
+                if entry is None:
+                    entry = self.totals[hotstring_id] = {
+                        "count": 0, "lastUsed": 0, "totalMs": 0.0, "maxMs": 0.0,
+                        "histogram": [0] * (len(LATENCY_BUCKETS) + 1), "strategies": {}, "triggers": {},
+                    }
+                latency_ms = latency * 1000
+                entry["count"] += 1
+                entry["lastUsed"] = max(entry["lastUsed"], when)
+                entry["totalMs"] += latency_ms
+                entry["maxMs"] = max(entry["maxMs"], latency_ms)
+                entry["histogram"][bucket_index(latency_ms)] += 1
+                entry["strategies"][strategy] = entry["strategies"].get(strategy, 0) + 1
+                entry["triggers"][trigger] = entry["triggers"].get(trigger, 0) + 1
+            self.save()
+
+    def save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"buckets": LATENCY_BUCKETS, "hotstrings": self.totals}, file, indent=4)
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        self.stop_event.set()
+        self.flush()
+
+    def get(self, hotstring_id):
+        return self.totals.get(hotstring_id)
+
+
+def bucket_index(latency_ms):
+    for index, limit in enumerate(LATENCY_BUCKETS):
+        if latency_ms <= limit:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def percentile(histogram, percent):
+    # Limite superior (ms) do balde que contém o percentil; None se passar do último limite
+    total = sum(histogram)
+    if not total:
+        return 0
+    target = total * percent / 100
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= target:
+            return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else None
+    return None
+
+
+def report(hotstrings, totals):
+    # Uma linha por hotstring da biblioteca, incluindo as que nunca foram usadas
+    rows = []
+    for hotstring in hotstrings:
+        entry = totals.get(hotstring.get("id"))
+        count = entry["count"] if entry else 0
+        rows.append({
+            "id": hotstring.get("id"),
+            "triggers": ", ".join(hotstring["triggers"]),
+            "count": count,
+            "lastUsed": entry["lastUsed"] if entry else None,
+            "meanMs": entry["totalMs"] / count if count else 0.0,
+            "p95Ms": percentile(entry["histogram"], 95) if entry else 0,
+            "maxMs": entry["maxMs"] if entry else 0.0,
+            "strategies": entry["strategies"] if entry else {},
+        })
+    return rows
+
+
+def unused(rows):
+    return [row for row in rows if not row["count"]]
+
+
+def slowest(rows, limit=20):
+    return sorted((row for row in rows if row["count"]), key=lambda row: row["meanMs"], reverse=True)[:limit]
+
+
+def most_used(rows, limit=20):
+    return sorted(rows, key=lambda row: row["count"], reverse=True)[:limit]
+
+
+def main(argv=None):
+    from hotstring_engine import CONFIG_FILE
+    from hotstring_storage import HotstringStore
+
+    parser = argparse.ArgumentParser(description="Usage and latency statistics per hotstring.")
+    parser.add_argument("--config", default=CONFIG_FILE)
+    parser.add_argument("--stats", default=STATS_FILE)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--unused", action="store_true", help="list hotstrings that never fired")
+    group.add_argument("--slowest", type=int, metavar="N", help="list the N slowest hotstrings")
+    parser.add_argument("--top", type=int, default=20, metavar="N", help="list the N most used hotstrings (default)")
+    parser.add_argument("--json", action="store_true", help="print the rows as JSON")
+    args = parser.parse_args(argv)
+
+    hotstrings = HotstringStore(args.config, snapshot=list).load()
+    rows = report(hotstrings, UsageStats(args.stats).totals)
+    if args.unused:
+        rows = unused(rows)
+    elif args.slowest is not None:
+        rows = slowest(rows, args.slowest)
+    else:
+        rows = most_used(rows, args.top)
+
+    if args.json:
+        print(json.dumps(rows, indent=4))
+        return 0
+    print(f"{'count':>7} {'mean_ms':>9} {'p95_ms':>7} {'max_ms':>9}  {'last_used':<19}  triggers")
+    for row in rows:
+        last_used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["lastUsed"])) if row["lastUsed"] else "-"
+        p95 = f">{LATENCY_BUCKETS[-1]}" if row["p95Ms"] is None else row["p95Ms"]
+        print(f"{row['count']:>7} {row['meanMs']:>9.2f} {p95:>7} {row['maxMs']:>9.2f}  {last_used:<19}  {row['triggers']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import threading
+
+from hotstring_library import ensure_id
+from hotstring_log import logger
+
+
+# Incrementar quando o formato dos objetos guardados no snapshot mudar
+SNAPSHOT_VERSION = 10
+
+
+class HotstringStore:
+    # hotstrings.json + diário de alterações (journal) só de acréscimo:
+    # cada edição grava uma linha no journal; a compactação reescreve o JSON
+    # num arquivo temporário e o renomeia atomicamente por cima do original
+    def __init__(self, path, snapshot, flush_delay=0.5, compact_every=200):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.snapshot = snapshot  # Função que retorna a lista atual de hotstrings (para compactar)
+        self.flush_delay = flush_delay  # Edições dentro desta janela viram uma única escrita
+        self.compact_every = compact_every  # Compacta quando o journal passa desse número de operações
+        self.lock = threading.Lock()
+        self.pending = []
+        self.journal_size = 0
+        self.timer = None
+        # Número de sequência da última operação; o JSON guarda até onde já foi compactado
+        self.seq = 0
+        # Perfis: nome -> lista de categorias ativas (seção "profiles" do JSON)
+        self.profiles = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            data = {"hotstrings": []}
+        # Registros por id estável; assigned_ids indica que o JSON precisa ser regravado com os ids novos
+        self.assigned_ids = False
+        hotstrings = {}
+        for hotstring in data["hotstrings"]:
+            self.assigned_ids |= ensure_id(hotstring)
+            hotstrings[hotstring["id"]] = hotstring
+        self.seq = data.get("seq", 0)
+        self.profiles = data.get("profiles", {})
+
+        # Reaplica as operações do journal que ainda não foram compactadas
+        self.journal_size = 0
+        try:
+            with open(self.journal_path, "r") as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha truncada por uma falha durante a escrita
+                        break
+                    self.journal_size += 1
+                    # Operações já incluídas no JSON (falha entre a compactação e a limpeza do journal)
+                    if entry["seq"] <= self.seq:
+                        continue
+                    self.apply(hotstrings, entry)
+                    self.seq = entry["seq"]
+        except FileNotFoundError:
+            pass
+        return list(hotstrings.values())
+
+    def apply(self, hotstrings, entry):
+        if entry["op"] in ("add", "replace"):
+            hotstring = entry["hotstring"]
+            self.assigned_ids |= ensure_id(hotstring)
+            hotstrings[hotstring["id"]] = hotstring
+        elif entry["op"] == "delete":
+            if "id" in entry:
+                hotstrings.pop(entry["id"], None)
+            else:
+                # Journal anterior aos ids: remove o primeiro registro igual
+                for hotstring_id, hotstring in hotstrings.items():
+                    if {**hotstring, "id": None} == {**entry["hotstring"], "id": None}:
+                        del hotstrings[hotstring_id]
+                        break
+
+    def append(self, op, hotstring):
+        # Registra a operação (add, replace ou delete) e agenda uma única escrita para a rajada de edições
+        with self.lock:
+            self.seq += 1
+            if op == "delete":
+                entry = {"seq": self.seq, "op": op, "id": hotstring["id"]}
+            else:
+                entry = {"seq": self.seq, "op": op, "hotstring": hotstring}
+            self.pending.append(json.dumps(entry))
+            if self.timer is None:
+                self.timer = threading.Timer(self.flush_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.pending:
+                return
+            lines, self.pending = self.pending, []
+            with open(self.journal_path, "a") as journal:
+                journal.write("\n".join(lines) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+            self.journal_size += len(lines)
+            compact = self.journal_size >= self.compact_every
+        if compact:
+            self.compact()
+
+    def compact(self):
+        with self.lock:
+            data = {"hotstrings": list(self.snapshot()), "seq": self.seq}
+            if self.profiles:
+                data["profiles"] = self.profiles
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as file:
+                json.dump(data, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+            # O JSON já contém tudo o que estava no journal
+            self.pending = []
+            self.journal_size = 0
+            try:
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self.flush()
+        if self.journal_size:
+            self.compact()
+
+
+class SnapshotCache:
+    # Snapshot binário (pickle) da biblioteca já processada: registros, trie do matcher e
+    # snippets compilados. Só é usado se os arquivos de origem não mudaram (mtime + tamanho + hash)
+    def __init__(self, path, sources):
+        self.path = path
+        self.sources = sources
+
+    def key(self):
+        # Os snippets guardam code objects em marshal, que só vale para a mesma versão do Python
+        key = [SNAPSHOT_VERSION, importlib.util.MAGIC_NUMBER]
+        for source in self.sources:
+            try:
+                with open(source, "rb") as file:
+                    stat = os.fstat(file.fileno())
+                    digest = hashlib.sha1(file.read()).hexdigest()
+            except FileNotFoundError:
+                key.append(None)
+                continue
+            key.append((stat.st_mtime_ns, stat.st_size, digest))
+        return key
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as file:
+                # A chave é lida antes dos dados: um snapshot desatualizado não é desserializado
+                if pickle.load(file) != self.key():
+                    return None
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Snapshot corrompido ou de outra versão: reconstrói a partir do JSON
+            logger.warning("Ignoring hotstring snapshot: %s", e)
+            return None
+
+    def save(self, data):
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                pickle.dump(self.key(), file, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            # O snapshot é só um cache: sem ele o próximo início lê o JSON (nunca impede abrir/fechar)
+            logger.warning("Could not save hotstring snapshot: %s", e)
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def record_key(hotstring):
+    return json.dumps(hotstring, sort_keys=True)
+
+
+def diff_hotstrings(library, new):
+    # Compara a biblioteca em memória com os registros relidos do arquivo, pelo id estável.
+    # Retorna (added, removed, changed), com changed = [(registro antigo, registro novo)]
+    added = []
+    changed = []
+    new_ids = set()
+    for hotstring in new:
+        new_ids.add(hotstring["id"])
+        current = library.get(hotstring["id"])
+        if current is None:
+            added.append(hotstring)
+        elif record_key(current) != record_key(hotstring):
+            changed.append((current, hotstring))
+    removed = [hotstring for hotstring in library if hotstring["id"] not in new_ids]
+    return added, removed, changed
+
+
+class FileWatcher:
+    # Detecta alterações externas num arquivo por polling de mtime/tamanho (sem dependências)
+    def __init__(self, path):
+        self.path = path
+        self.last_stat = self.stat()
+
+    def stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def changed(self):
+        stat = self.stat()
+        if stat == self.last_stat:
+            return False
+        self.last_stat = stat
+        return True
@@ -0,0 +1,62 @@
+import sys
+
+from hotstring_matcher import trigger_mode
+from hotstring_persistent import ChunkedDict, ChunkedList
+
+
+class CompiledHotstring:
+    # Só o que a expansão precisa, sem o dict completo do registro
+    __slots__ = ("id", "replacement", "back_count", "snippet", "template", "mode")
+
+    def __init__(self, hotstring_id, replacement, back_count=0, snippet=None, template=None, mode=None):
+        self.id = hotstring_id
+        self.replacement = replacement
+        self.back_count = back_count
+        self.snippet = snippet  # Snippet compilado, ou None para texto simples
+        self.template = template  # Template compilado ({date}, {clipboard}, {cursor}), ou None
+        self.mode = mode  # TriggerMode compartilhado: caixa, teclas finais, imediato, sufixo
+
+
+class HotstringTable:
+    # Tabela compacta usada no caminho da tecla: um registro por hotstring (não por trigger),
+    # com replacements internados. A trie guarda apenas (trigger, índice) e a expansão busca
+    # o registro pelo índice
+    def __init__(self):
+        self.records = ChunkedList()
+        self.index_by_id = ChunkedDict()
+
+    def copy(self):
+        # Nova versão para edição; os registros são imutáveis e os blocos só são copiados quando alterados
+        table = HotstringTable()
+        table.records = self.records.copy()
+        table.index_by_id = self.index_by_id.copy()
+        return table
+
+    def __len__(self):
+        return len(self.index_by_id)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def add(self, hotstring, snippet=None, template=None):
+        record = CompiledHotstring(hotstring["id"], sys.intern(hotstring["replacement"]),
+                                   hotstring.get("backCount", 0), snippet, template,
+                                   trigger_mode(hotstring))
+        index = self.index_by_id.get(record.id)
+        if index is None:
+            index = len(self.records)
+            self.records.append(record)
+            self.index_by_id[record.id] = index
+        else:
+            # Edição: mesmo índice, então os triggers que continuam na trie já apontam para o registro novo
+            self.records[index] = record
+        return index
+
+    def remove(self, hotstring_id):
+        # O índice não é reaproveitado: um evento ainda em andamento nunca expande outra hotstring
+        index = self.index_by_id.pop(hotstring_id, None)
+        if index is not None:
+            self.records[index] = None
+
+    def index(self, hotstring_id):
+        return self.index_by_id.get(hotstring_id)
@@ -0,0 +1,87 @@
+import datetime
+import re
+
+try:
+    import pyperclip
+except ImportError:
+    pyperclip = None
+
+
+# Campos dinâmicos aceitos no replacement: {date}, {date:%d/%m/%Y}, {time}, {clipboard} e {cursor}.
+# Chaves dobradas ({{date}}) geram o texto literal; qualquer outra chave é texto comum
+FIELD = re.compile(r"\{\{(date|time|clipboard|cursor)((?::[^{}]*)?)\}\}|\{(date|time|clipboard|cursor)(?::([^{}]*))?\}")
+DEFAULT_FORMATS = {"date": "%Y-%m-%d", "time": "%H:%M:%S"}
+# Diretivas aceitas em todas as plataformas (strftime no Linux não rejeita as inválidas)
+DIRECTIVE = re.compile(r"%(.?)", re.DOTALL)
+VALID_DIRECTIVES = set("aAbBcdfGHIjmMpSuUVwWxXyYzZ%")
+
+
+def is_template(replacement):
+    return FIELD.search(replacement) is not None
+
+
+def render_literal(text):
+    return text
+
+
+def render_datetime(fmt):
+    return datetime.datetime.now().strftime(fmt)
+
+
+def render_clipboard(_):
+    if pyperclip is None:
+        return ""
+    try:
+        return pyperclip.paste() or ""
+    except pyperclip.PyperclipException:
+        return ""
+
+
+class Template:
+    # Replacement compilado uma vez em partes (função, argumento): o texto fixo fica pronto
+    # e só os campos dinâmicos são calculados a cada expansão, sem exec
+    __slots__ = ("parts", "cursor")
+
+    def __init__(self, replacement):
+        self.parts = []
+        self.cursor = None  # Índice da parte onde fica o cursor ({cursor}), ou None
+        literal = []
+        position = 0
+        for match in FIELD.finditer(replacement):
+            literal.append(replacement[position:match.start()])
+            position = match.end()
+            if match.group(1):
+                literal.append("{" + match.group(1) + match.group(2) + "}")
+                continue
+            name, arg = match.group(3), match.group(4)
+            if name == "cursor":
+                if self.cursor is None:
+                    self._add_literal(literal)
+                    self.cursor = len(self.parts)
+                continue
+            self._add_literal(literal)
+            if name == "clipboard":
+                self.parts.append((render_clipboard, None))
+            else:
+                # Valida o formato na compilação (ValueError para quem chamou)
+                fmt = arg or DEFAULT_FORMATS[name]
+                for directive in DIRECTIVE.findall(fmt):
+                    if directive not in VALID_DIRECTIVES:
+                        raise ValueError(f"Formato de data inválido: {fmt}")
+                self.parts.append((render_datetime, fmt))
+        literal.append(replacement[position:])
+        self._add_literal(literal)
+
+    def _add_literal(self, literal):
+        text = "".join(literal)
+        literal.clear()
+        if text:
+            self.parts.append((render_literal, text))
+
+    def render(self):
+        # Retorna (texto, posições que o cursor volta a partir do fim)
+        rendered = [render(arg) for render, arg in self.parts]
+        text = "".join(rendered)
+        if self.cursor is None:
+            return text, 0
+        return text, sum(len(part) for part in rendered[self.cursor:])
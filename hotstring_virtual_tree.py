@@ -0,0 +1,112 @@
+from tkinter import ttk
+
+
+class VirtualTreeview:
+    # Lista virtualizada sobre um ttk.Treeview: só existem linhas para a janela visível
+    # (slots reaproveitados); rolar ou trocar a lista apenas atualiza os valores dos slots
+    # que mudaram, então o custo depende do tamanho da janela, não da biblioteca
+    def __init__(self, tree, scrollbar, row_values, row_height=20):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values  # Função registro -> tupla de valores das colunas
+        self.row_height = row_height  # Só usado se nem o estilo nem um slot informarem a altura
+        self.rows = []
+        self.offset = 0
+        self.page_size = int(tree.cget("height")) or 10
+        self.slots = []  # iids das linhas materializadas
+        self.shown = []  # (registro, valores) exibidos em cada slot
+
+        self.scrollbar.configure(command=self.yview)
+        self.tree.bind("<Configure>", self.on_configure)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self.on_arrow(-1))
+        self.tree.bind("<Down>", lambda event: self.on_arrow(1))
+
+    def set_rows(self, rows):
+        # A lista é usada por referência: acréscimos no fim aparecem no próximo render()
+        self.rows = rows
+        self.render()
+
+    def render(self):
+        self.offset = max(0, min(self.offset, len(self.rows) - self.page_size))
+        visible = self.rows[self.offset:self.offset + self.page_size]
+
+        for index, record in enumerate(visible):
+            values = self.row_values(record)
+            if index < len(self.slots):
+                shown_record, shown_values = self.shown[index]
+                if shown_record is not record or shown_values != values:
+                    self.tree.item(self.slots[index], values=values)
+                    self.shown[index] = (record, values)
+            else:
+                self.slots.append(self.tree.insert("", "end", values=values))
+                self.shown.append((record, values))
+
+        # Remove os slots que sobraram (lista menor que a janela)
+        extra = self.slots[len(visible):]
+        if extra:
+            self.tree.delete(*extra)
+            del self.slots[len(visible):]
+            del self.shown[len(visible):]
+
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.page_size) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def selected_records(self):
+        selection = set(self.tree.selection())
+        return [self.shown[index][0] for index, iid in enumerate(self.slots) if iid in selection]
+
+    def scroll(self, rows):
+        offset = self.offset
+        self.offset += rows
+        self.render()
+        if self.offset != offset:
+            # A seleção pertence ao slot, não ao registro: limpa ao rolar
+            self.tree.selection_set(())
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.rows))
+            self.render()
+            self.tree.selection_set(())
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.scroll(amount * self.page_size if args[2] == "pages" else amount)
+
+    def on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_arrow(self, step):
+        # Setas no primeiro/último slot rolam a janela
+        focus = self.tree.focus()
+        if focus in self.slots:
+            index = self.slots.index(focus)
+            if (step < 0 and index == 0) or (step > 0 and index == len(self.slots) - 1):
+                self.scroll(step)
+                return "break"
+
+    def measure(self):
+        # (altura do cabeçalho, altura da linha) reais, que mudam com DPI e tema: bbox de um
+        # slot já desenhado ou, antes disso, o rowheight do estilo do Treeview
+        if self.slots:
+            bbox = self.tree.bbox(self.slots[0])
+            if bbox and bbox[3] > 0:
+                return bbox[1], bbox[3]
+        try:
+            row_height = int(ttk.Style(self.tree).lookup(self.tree.cget("style") or "Treeview", "rowheight"))
+        except (ValueError, TypeError):
+            row_height = 0
+        row_height = row_height or self.row_height
+        return row_height, row_height
+
+    def on_configure(self, event):
+        header, row_height = self.measure()
+        page_size = max(1, (event.height - header) // row_height)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# Os módulos ficam na raiz do repositório (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hotstring_library import new_id  # noqa: E402
+
+
+def record(trigger, replacement="x", category="Geral", **fields):
+    # Registro mínimo como o gravado no hotstrings.json (id novo, a menos que seja passado)
+    return {"id": new_id(), "triggers": [trigger], "replacement": replacement, "category": category,
+            "prefix": "", "backCount": 0, **fields}
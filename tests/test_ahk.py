@@ -0,0 +1,52 @@
+import io
+
+from hotstring_ahk import read_ahk, write_ahk
+
+
+def parse(text):
+    skipped = []
+    return list(read_ahk(io.StringIO(text), skipped)), skipped
+
+
+def test_empty_body_does_not_swallow_next_hotstring():
+    hotstrings, skipped = parse("::a1::\n::a2::same\n")
+    assert [hs["triggers"] for hs in hotstrings] == [["a2"]]
+    assert skipped == ["line 1: 'a1' runs code, not text"]
+
+
+def test_continuation_block_and_options():
+    hotstrings, skipped = parse("; category: Git\n:*C1:gst::\n(\ngit status\n  -s\n)\n::brb::be right back{Left 2} ; volto\n")
+    assert skipped == []
+    gst, brb = hotstrings
+    assert gst["replacement"] == "git status\n  -s" and gst["options"] == "*C1" and gst["category"] == "Git"
+    # Sem C/C0/C1 no arquivo vale o padrão do AutoHotkey, registrado explicitamente
+    assert brb["options"] == "C0" and brb["backCount"] == 2 and brb["comment"] == "volto"
+    assert brb["replacement"] == "be right back"
+
+
+def test_round_trip():
+    hotstrings = [
+        {"triggers": ["sig", "@sig"], "replacement": "Abraço,\nFulano", "category": "Email", "prefix": "", "backCount": 0},
+        {"triggers": ["fn"], "replacement": "function () {}", "category": "JavaScript", "prefix": "", "backCount": 1, "options": "*C"},
+        {"triggers": ["pct"], "replacement": "100% ; não é comentário", "category": "JavaScript", "prefix": "", "backCount": 0, "options": "C0"},
+        {"triggers": ["raw"], "replacement": "  espaços  ", "category": "Outros", "prefix": "", "backCount": 0, "options": "C0"},
+    ]
+    file = io.StringIO()
+    assert write_ahk(hotstrings, file) == 4
+    parsed, skipped = parse(file.getvalue())
+    assert skipped == []
+    # Uma linha por trigger no .ahk; aliases seguidos voltam como um único registro
+    assert [hs["triggers"] for hs in parsed] == [hs["triggers"] for hs in hotstrings]
+    for original, hotstring in zip(hotstrings, parsed):
+        assert hotstring["replacement"] == original["replacement"]
+        assert hotstring["category"] == original["category"]
+        assert hotstring["backCount"] == original["backCount"]
+        # Registros sem opção de caixa são exatos (C) também no .ahk
+        assert hotstring["options"] == original.get("options", "C")
+
+
+def test_snippets_are_not_exported():
+    skipped = []
+    file = io.StringIO()
+    write_ahk([{"triggers": ["now"], "replacement": "python print(1)", "category": "x", "prefix": "", "backCount": 0}], file, skipped)
+    assert len(skipped) == 1 and "now" in skipped[0]
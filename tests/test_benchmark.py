@@ -0,0 +1,9 @@
+import benchmark
+
+
+def test_benchmark_replays_through_the_engine():
+    result = benchmark.run(size=50, words=40, seed=1, hit_ratio=0.5)
+    assert result["expansions"] > 0
+    # Mesmo corpus, mesmo resultado: o benchmark é determinístico
+    again = benchmark.run(size=50, words=40, seed=1, hit_ratio=0.5)
+    assert (again["keystrokes"], again["expansions"]) == (result["keystrokes"], result["expansions"])
@@ -0,0 +1,200 @@
+import json
+import random
+
+import pytest
+
+import hotstring_engine
+from conftest import record
+from hotstring_backend import FakeKeyboardBackend
+from hotstring_engine import HotstringEngine
+from hotstring_search import SearchIndex
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "hotstrings.json"
+    path.write_text(json.dumps({
+        "hotstrings": [record("btw", "by the way"), record("sig", "Regards", category="Work")],
+        "profiles": {"Work": ["Work"]},
+    }))
+    return path
+
+
+class ShiftEchoBackend(FakeKeyboardBackend):
+    # Como o keyboard no Linux: o eco das maiúsculas vem precedido de shift
+    def press(self, name, event_time=None):
+        if len(name) == 1 and name.isupper():
+            super().press("shift", event_time)
+        super().press(name, event_time)
+
+
+def start(config, echo=False, backend=None):
+    folder = config.parent
+    if backend is None:
+        backend = FakeKeyboardBackend(echo=echo)
+    engine = HotstringEngine(backend, config_file=str(config),
+                             snapshot_file=str(folder / "hotstrings.cache"), stats_file=str(folder / "stats.json"),
+                             pacing_file=str(folder / "pacing.json"), snippet_processes=False)
+    engine.injector.clipboard = None
+    return engine
+
+
+@pytest.fixture
+def engine(config):
+    engine = start(config)
+    yield engine
+    engine.close()
+
+
+def type_word(engine, word, end=" "):
+    # Retorna o que o motor injetou em resposta à palavra digitada
+    engine.backend.injected.clear()
+    engine.backend.type_text(word + end)
+    engine.events.wait_idle()
+    return [content for _, content, _ in engine.backend.injected]
+
+
+def test_expansion(engine):
+    assert type_word(engine, "btw") == ["backspace, backspace, backspace, backspace", "by the way"]
+    assert type_word(engine, "xbtw") == []
+
+
+def test_cursor_template(engine):
+    # {cursor}: o cursor volta até a posição do campo
+    engine.add_hotstring(record("tag", "<b>{cursor}</b>"))
+    assert type_word(engine, "tag")[1:] == ["<b></b>", "left, left, left, left"]
+
+
+def test_case_is_exact_by_default(engine):
+    assert type_word(engine, "BTW") == []
+    engine.add_hotstring(record("idk", "I don't know", options="C0"))
+    assert type_word(engine, "IDK")[1] == "I DON'T KNOW"
+
+
+def test_profiles(engine):
+    assert type_word(engine, "sig")[1] == "Regards"
+    engine.set_profile("Work")
+    assert type_word(engine, "btw") == []
+    assert type_word(engine, "sig")[1] == "Regards"
+
+
+def test_edits_are_applied_and_journaled(engine, config):
+    engine.add_hotstring(record("omw", "on my way"))
+    engine.delete_hotstrings(engine.library.find_trigger("btw"))
+    assert type_word(engine, "omw")[1] == "on my way"
+    assert type_word(engine, "btw") == []
+    engine.store.flush()
+    triggers = sorted(hs["triggers"][0] for hs in engine.store.load())
+    assert triggers == ["omw", "sig"]
+
+
+def test_reload_edited_record(engine, config):
+    data = json.loads(config.read_text())
+    data["hotstrings"][0]["replacement"] = "edited"
+    config.write_text(json.dumps(data))
+    engine.reload_hotstrings()
+    assert type_word(engine, "btw")[1] == "edited"
+
+
+def test_search_index_is_built_in_background(engine):
+    assert engine.search_ready.wait(5)
+    engine.add_hotstring(record("omw", "on my way"))
+    assert [hs["triggers"] for hs in engine.search("my way")] == [["omw"]]
+
+
+def test_search_index_catches_up_with_edits_made_while_building(engine, monkeypatch):
+    assert engine.search_ready.wait(5)
+    engine._search_index = None
+
+    def build(library):
+        # Edição publicada enquanto o índice da versão anterior é construído
+        engine.add_hotstring(record("omw", "on my way"))
+        return SearchIndex(library)
+
+    monkeypatch.setattr(hotstring_engine, "SearchIndex", build)
+    engine.build_search_index()
+    assert [hs["triggers"] for hs in engine.search("my way")] == [["omw"]]
+    assert [hs["triggers"] for hs in engine.search("btw")] == [["btw"]]
+
+
+def trie_entries(root):
+    # {(trie, caminho): entradas na ordem} das duas tries de uma raiz
+    found = {}
+    stack = [("prefix", "", root), ("suffix", "", root.suffixes)]
+    while stack:
+        kind, path, node = stack.pop()
+        if node.entries:
+            found[(kind, path)] = list(node.entries.items())
+        stack.extend((kind, path + char, child) for char, child in node.children.items())
+    return found
+
+
+def test_incremental_roots_match_full_build(engine):
+    rng = random.Random(7)
+    triggers = ["ab", "AB", "Ab", "abc", "b"]
+    options = ["", "C0", "C1", "?", "*", "C1?"]
+
+    def random_record():
+        return record(rng.choice(triggers), rng.choice("xyz"), rng.choice(["Geral", "Work"]),
+                      options=rng.choice(options))
+
+    for _ in range(200):
+        records = engine.library.all()
+        operation = rng.random()
+        if operation < 0.4 or not records:
+            engine.apply_changes(added=[random_record()])
+        elif operation < 0.7:
+            old = rng.choice(records)
+            engine.apply_changes(changed=[(old, {**random_record(), "id": old["id"]})])
+        else:
+            engine.apply_changes(removed=[rng.choice(records)])
+        state = engine.state
+        full = engine.build_roots({}, state.library, state.table)
+        for profile, root in state.roots.items():
+            assert trie_entries(root) == trie_entries(full[profile])
+
+
+def test_restart_uses_snapshot(config):
+    engine = start(config)
+    engine.add_hotstring(record("omw", "on my way"))
+    engine.close()
+    engine = start(config)
+    try:
+        assert engine.snapshot.load() is not None
+        assert type_word(engine, "omw")[1] == "on my way"
+        assert type_word(engine, "btw")[1] == "by the way"
+    finally:
+        engine.close()
+
+
+def test_keys_after_expansion_are_not_swallowed(config):
+    engine = start(config, echo=True)
+    try:
+        engine.add_hotstring(record("JS", "javascript", options="C1"))
+        assert type_word(engine, "JS")[1] == "javascript"
+        # A tecla seguinte difere do eco esperado: é do usuário e dispara de novo
+        assert type_word(engine, "Js")[1] == "javascript"
+        assert engine.events.suppressed > 0
+    finally:
+        engine.close()
+
+
+def test_end_character_is_typed_again(engine):
+    engine.add_hotstring(record("omw", "on my way", endChars=" .\n"))
+    engine.add_hotstring(record("tag", "<b>{cursor}</b>", endChars="."))
+    assert type_word(engine, "omw", ".") == ["backspace, backspace, backspace, backspace", "on my way."]
+    assert type_word(engine, "omw", "\n")[1] == "on my way\n"
+    # O espaço continua consumido
+    assert type_word(engine, "omw")[1] == "on my way"
+    # O cursor volta também sobre a tecla final
+    assert type_word(engine, "tag", ".")[1:] == ["<b></b>.", "left, left, left, left, left"]
+
+
+def test_injected_text_does_not_trigger_expansions(config):
+    engine = start(config, backend=ShiftEchoBackend(echo=True))
+    try:
+        engine.add_hotstring(record("ush", "Use btw here ok"))
+        assert type_word(engine, "ush") == ["backspace, backspace, backspace, backspace", "Use btw here ok"]
+        assert engine.events.suppressed == 19 and engine.pacing.rejected == 0
+    finally:
+        engine.close()
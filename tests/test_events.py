@@ -0,0 +1,57 @@
+import time
+
+from hotstring_backend import KEY_DOWN, FakeKeyEvent
+from hotstring_events import ECHO_GRACE, EventPipeline
+
+
+def pipeline():
+    keys = []
+    # None marca o reinício do matcher (on_overflow)
+    events = EventPipeline(lambda name, event_time: keys.append(name), on_overflow=lambda: keys.append(None))
+    events.start()
+    return events, keys
+
+
+def push(events, *names):
+    for name in names:
+        events.push(FakeKeyEvent(KEY_DOWN, name, time.time()))
+    events.wait_idle()
+
+
+def test_exact_echo_is_suppressed():
+    events, keys = pipeline()
+    events.expect([("keys", "backspace, backspace", 0), ("text", "Hi", 0)])
+    push(events, "backspace", "backspace", "h", "i", "x")
+    assert keys == ["x"]
+    assert events.suppressed == 4 and not events.echo
+    events.stop()
+
+
+def test_user_key_during_echo():
+    events, keys = pipeline()
+    events.expect([("text", "abc", 0)])
+    push(events, "a", "j", "b", "c", "x")
+    # A tecla do usuário não consome o eco; o resto do eco continua suprimido e o matcher
+    # recomeça na primeira tecla depois da injeção
+    assert keys == [None, "x"]
+    assert events.suppressed == 3 and events.interrupted == 1
+    events.stop()
+
+
+def test_modifiers_are_ignored_in_echo():
+    events, keys = pipeline()
+    events.expect([("text", "Hi", 0), ("paste", "long text", 0)])
+    push(events, "shift", "H", "right shift", "i", "ctrl", "v", "x")
+    assert keys == ["x"]
+    assert events.suppressed == 3 and events.interrupted == 0
+    events.stop()
+
+
+def test_echo_expires_after_grace():
+    events, keys = pipeline()
+    events.expect([("text", "ab", 0)])
+    events.injected()
+    time.sleep(ECHO_GRACE * 1.5)
+    push(events, "a", "b")
+    assert keys == ["a", "b"]
+    events.stop()
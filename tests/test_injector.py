@@ -0,0 +1,63 @@
+from hotstring_backend import FakeKeyboardBackend
+from hotstring_injector import PACING_NONE, STRATEGY_PASTE, STRATEGY_TYPE, Injector, batch_key_names
+
+
+class Clipboard:
+    def __init__(self, content="saved", fail=False):
+        self.content = content
+        self.fail = fail
+        self.copies = []
+
+    def paste(self):
+        return self.content
+
+    def copy(self, text):
+        if self.fail:
+            raise RuntimeError("could not find a copy/paste mechanism")
+        self.copies.append(text)
+        self.content = text
+
+
+def injector(clipboard=None, **options):
+    backend = FakeKeyboardBackend()
+    return Injector(backend=backend, pacing=PACING_NONE, clipboard=clipboard, paste_threshold=10,
+                    paste_delay=0, **options), backend
+
+
+def sent(backend):
+    return [(kind, content) for kind, content, _ in backend.injected]
+
+
+def test_short_text_is_typed():
+    inject, backend = injector(Clipboard())
+    assert inject.expand(4, "short", back_count=2) == STRATEGY_TYPE
+    assert sent(backend) == [("keys", "backspace, backspace, backspace, backspace"), ("text", "short"),
+                             ("keys", "left, left")]
+
+
+def test_long_text_is_pasted_and_clipboard_restored():
+    clipboard = Clipboard()
+    inject, backend = injector(clipboard)
+    assert inject.expand(2, "a long replacement") == STRATEGY_PASTE
+    assert sent(backend) == [("keys", "backspace, backspace"), ("keys", "ctrl+v")]
+    assert clipboard.copies == ["a long replacement", "saved"]
+    assert inject.last_strategy == STRATEGY_PASTE
+
+
+def test_without_clipboard_long_text_is_typed():
+    inject, backend = injector(None)
+    assert inject.expand(0, "a long replacement") == STRATEGY_TYPE
+    assert sent(backend) == [("text", "a long replacement")]
+
+
+def test_broken_clipboard_falls_back_to_typing():
+    inject, backend = injector(Clipboard(fail=True))
+    assert inject.expand(2, "a long replacement") == STRATEGY_TYPE
+    assert sent(backend) == [("keys", "backspace, backspace"), ("text", "a long replacement")]
+    # As próximas expansões já são digitadas, sem tentar o clipboard
+    assert inject.clipboard is None and inject.choose_strategy("a long replacement") == STRATEGY_TYPE
+
+
+def test_batch_key_names():
+    batch = [("keys", "backspace, shift+left", 2), ("text", "Hi\n", 3), ("paste", "long", 1)]
+    assert batch_key_names(batch) == ["backspace", "left", "h", "i", "enter", "v"]
@@ -0,0 +1,38 @@
+from conftest import record
+from hotstring_library import HotstringLibrary
+
+
+def test_copy_replace_same_trigger():
+    library = HotstringLibrary([record("a", "x", id="1")])
+    copy = library.copy()
+    copy.replace("1", record("a", "y"))
+    assert [hs["replacement"] for hs in copy.find_trigger("a")] == ["y"]
+    assert [hs["replacement"] for hs in copy.in_category("Geral")] == ["y"]
+    # A versão original continua intacta
+    assert [hs["replacement"] for hs in library.find_trigger("a")] == ["x"]
+
+
+def test_copy_remove_then_add_same_keys():
+    library = HotstringLibrary([record("a", "x", id="1")])
+    copy = library.copy()
+    copy.remove("1")
+    assert copy.find_trigger("a") == [] and copy.categories() == []
+    copy.add(record("a", "z", id="2"))
+    assert [hs["id"] for hs in copy.find_trigger("a")] == ["2"]
+    assert copy.categories() == ["Geral"]
+    assert [hs["id"] for hs in library.find_trigger("a")] == ["1"]
+
+
+def test_copy_move_category():
+    library = HotstringLibrary([record("a", "x", "Git", id="1"), record("b", "y", "Git", id="2")])
+    copy = library.copy()
+    copy.replace("1", record("a", "x", "Email"))
+    assert sorted(copy.categories()) == ["Email", "Git"]
+    assert [hs["id"] for hs in copy.in_category("Git")] == ["2"]
+    assert len(library.in_category("Git")) == 2
+
+
+def test_find_duplicate():
+    library = HotstringLibrary([record("a", "x", id="1")])
+    assert library.find_duplicate(record("a", "x"))["id"] == "1"
+    assert library.find_duplicate(record("a", "other")) is None
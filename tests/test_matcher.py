@@ -0,0 +1,114 @@
+import pickle
+
+from hotstring_matcher import HotstringMatcher, TriggerMode, conform_case, trigger_mode
+
+
+def matcher_with(*hotstrings):
+    matcher = HotstringMatcher()
+    entries = []
+    for index, hotstring in enumerate(hotstrings):
+        mode = trigger_mode(hotstring)
+        entries.extend((trigger, (trigger, index), mode) for trigger in hotstring["triggers"])
+    matcher.update(added=entries)
+    return matcher
+
+
+def hotstring(trigger, **fields):
+    return {"triggers": [trigger], "replacement": trigger.upper(), **fields}
+
+
+def feed(matcher, keys):
+    # Retorna os índices disparados e (typed, end_key) do último disparo
+    fired = []
+    for key in keys:
+        match = matcher.feed(key)
+        if match is not None:
+            fired.append(match[1])
+    return fired
+
+
+def test_exact_case_by_default():
+    matcher = matcher_with(hotstring("btw"))
+    assert feed(matcher, ["b", "t", "w", "space"]) == [0]
+    assert matcher.typed == "btw" and matcher.end_key == "space"
+    assert feed(matcher, ["B", "t", "w", "space"]) == []
+
+
+def test_case_insensitive_options():
+    matcher = matcher_with(hotstring("btw", options="C0"), hotstring("idk", options="C1"))
+    assert feed(matcher, ["B", "T", "W", "space"]) == [0]
+    assert matcher.typed == "BTW"
+    assert feed(matcher, ["I", "d", "k", "space"]) == [1]
+
+
+def test_exact_spelling_wins_over_case_insensitive():
+    matcher = matcher_with(hotstring("abc", options="C1"), hotstring("ABC", options="C"))
+    assert feed(matcher, ["A", "B", "C", "space"]) == [1]
+    assert feed(matcher, ["a", "B", "c", "space"]) == [0]
+
+
+def test_conform_case():
+    assert conform_case("by the way", "BTW", "btw") == "BY THE WAY"
+    assert conform_case("by the way", "Btw", "btw") == "By the way"
+    assert conform_case("by the way", "bTw", "btw") == "by the way"
+    # Digitado como cadastrado: texto como cadastrado
+    assert conform_case("JavaScript", "JS", "JS") == "JavaScript"
+
+
+def test_end_chars_and_default_space_only():
+    matcher = matcher_with(hotstring("brb"), hotstring("omw", endChars=".\n"))
+    assert feed(matcher, ["b", "r", "b", "enter"]) == []
+    assert feed(matcher, ["o", "m", "w", "space"]) == []
+    assert feed(matcher, ["o", "m", "w", "."]) == [1]
+    assert matcher.end_key == "."
+    assert feed(matcher, ["o", "m", "w", "enter"]) == [1]
+
+
+def test_immediate_fires_without_end_key():
+    matcher = matcher_with(hotstring("->", options="*"))
+    assert feed(matcher, ["-", ">"]) == [0]
+    assert matcher.typed == "->" and matcher.end_key is None
+    # Só no início de uma palavra
+    assert feed(matcher, ["space", "a", "-", ">"]) == []
+
+
+def test_suffix_matches_end_of_word():
+    matcher = matcher_with(hotstring("ing", options="?"), hotstring("xq", options="*?"))
+    assert feed(matcher, list("typing") + ["space"]) == [0]
+    assert matcher.typed == "ing"
+    assert feed(matcher, list("abcxq")) == [1]
+
+
+def test_separator_starts_new_word_but_can_be_part_of_trigger():
+    matcher = matcher_with(hotstring("clog"), hotstring("js.query"))
+    assert feed(matcher, list("hello.clog") + ["space"]) == [0]
+    assert feed(matcher, list("js.query") + ["space"]) == [1]
+
+
+def test_special_keys_reset_word():
+    matcher = matcher_with(hotstring("btw"))
+    assert feed(matcher, ["b", "t", "backspace", "t", "w", "space"]) == []
+    assert feed(matcher, ["shift", "b", "t", "w", "space"]) == [0]
+
+
+def test_build_does_not_touch_base_root():
+    matcher = matcher_with(hotstring("btw"))
+    old_root = matcher.root
+    new_root = matcher.build(old_root, removed=["btw"])
+    matcher.set_root(new_root)
+    assert feed(matcher, list("btw") + ["space"]) == []
+    matcher.set_root(old_root)
+    assert feed(matcher, list("btw") + ["space"]) == [0]
+
+
+def test_pickle_long_trigger():
+    trigger = "x" * 250
+    matcher = matcher_with(hotstring(trigger), hotstring("ing", options="?"))
+    matcher.set_root(pickle.loads(pickle.dumps(matcher.root)))
+    assert feed(matcher, list(trigger) + ["space"]) == [0]
+    assert feed(matcher, list("going") + ["space"]) == [1]
+
+
+def test_trigger_modes_are_shared():
+    assert trigger_mode({"options": "*C1"}) is trigger_mode({"options": "C1*"})
+    assert trigger_mode({}) is TriggerMode.get()
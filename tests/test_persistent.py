@@ -0,0 +1,35 @@
+import pickle
+
+from hotstring_persistent import CHUNK_SIZE, ChunkedDict, ChunkedList
+
+
+def test_chunked_list_copy_is_isolated():
+    items = ChunkedList(range(CHUNK_SIZE * 2 + 3))
+    copy = items.copy()
+    copy[5] = "x"
+    copy.append("tail")
+    assert items[5] == 5 and len(items) == CHUNK_SIZE * 2 + 3
+    assert copy[5] == "x" and copy[len(copy) - 1] == "tail"
+    # Os blocos não alterados continuam compartilhados
+    assert copy.chunks[1] is items.chunks[1]
+
+
+def test_chunked_dict_copy_is_isolated():
+    mapping = ChunkedDict()
+    for number in range(1000):
+        mapping[f"k{number}"] = number
+    copy = mapping.copy()
+    copy["k1"] = -1
+    assert copy.pop("k2") == 2 and copy.pop("k2") is None
+    copy["new"] = 0
+    assert mapping["k1"] == 1 and "k2" in mapping and "new" not in mapping
+    assert len(mapping) == 1000 and len(copy) == 1000
+    assert sorted(copy.values())[:2] == [-1, 0]
+
+
+def test_chunked_dict_pickle_rebuckets():
+    mapping = ChunkedDict()
+    for number in range(300):
+        mapping[str(number)] = number
+    loaded = pickle.loads(pickle.dumps(mapping))
+    assert len(loaded) == 300 and all(loaded[str(number)] == number for number in range(300))
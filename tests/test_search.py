@@ -0,0 +1,64 @@
+import pytest
+
+import hotstring_search
+from conftest import record
+from hotstring_search import SearchIndex
+
+
+def triggers(results):
+    return [hotstring["triggers"][0] for hotstring in results]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex([
+        record("xabc", "first"),
+        record("abcd", "second"),
+        record("abc", "third"),
+        record("zz", "mentions abc", category="Email"),
+        record("ab", "fourth"),
+        record("qq", "nothing here"),
+    ])
+
+
+def test_ranking(index):
+    # Trigger exato < prefixo de trigger < trigger contém < replacement/categoria
+    assert triggers(index.search("abc")) == ["abc", "abcd", "xabc", "zz"]
+    assert triggers(index.search("ABC")) == ["abc", "abcd", "xabc", "zz"]
+    assert triggers(index.search("ab")) == ["ab", "abcd", "abc", "xabc", "zz"]
+    assert triggers(index.search("email")) == ["zz"]
+    assert index.search("abcq") == []
+    assert len(index.search("")) == 6
+
+
+def test_results_are_ranked_on_demand(index):
+    results = index.search("ab")
+    assert len(results) == 5
+    assert triggers(results[0:2]) == ["ab", "abcd"]
+    assert len(results.ranked) == 2
+    assert triggers(results[1:4]) == ["abcd", "abc", "xabc"]
+    assert triggers(results) == ["ab", "abcd", "abc", "xabc", "zz"]
+
+
+def test_common_short_query_is_scanned(index, monkeypatch):
+    monkeypatch.setattr(hotstring_search, "SCAN_THRESHOLD", 1)
+    assert triggers(index.search("ab")) == ["ab", "abcd", "abc", "xabc", "zz"]
+    assert triggers(index.search("e")) == ["xabc", "abcd", "abc", "zz", "ab", "qq"]
+
+
+def test_add_and_remove(index):
+    assert len(index.search("ab")) == 5
+    removed = index.search("abc")[0]
+    results = index.search("b")
+    index.remove(removed)
+    index.add(record("abx", "new"))
+    # Resultados já retornados não mudam com edições posteriores
+    assert "abx" not in triggers(results)
+    assert triggers(index.search("ab")) == ["ab", "abcd", "abx", "xabc", "zz"]
+    assert len(index.search("b")) == len(results)
+    assert index.sorted_triggers == sorted(index.sorted_triggers)
+
+
+def test_record_with_several_triggers_is_listed_once():
+    index = SearchIndex([record("sig", "Regards", triggers=["sig", "sign"])])
+    assert len(index.search("sig")[:]) == 1
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from hotstring_snippets import Snippet, SnippetCache, SnippetPool
+
+SLOW = "import time\ntime.sleep(0.6)\nresult = 'slow'"
+STUCK = "while True:\n    pass"
+
+
+def submit(pool, source):
+    # Envia o snippet e retorna um Event que guarda (resultado, erro, instante da entrega)
+    done = threading.Event()
+
+    def on_done(result, error):
+        done.outcome = (result, error, time.monotonic())
+        done.set()
+
+    pool.submit(Snippet(source), on_done)
+    return done
+
+
+def outcome(done, timeout=5):
+    assert done.wait(timeout)
+    return done.outcome[:2]
+
+
+@pytest.fixture(params=[True, False], ids=["processes", "threads"])
+def processes(request):
+    return request.param
+
+
+def test_snippet_result_and_cache():
+    snippet = SnippetCache().compile("python result = 6 * 7", ttl=60)
+    assert snippet.run() == "42"
+    snippet.code = compile("result = 0", "<hotstring>", "exec")
+    # Dentro do ttl o último resultado é reaproveitado
+    assert snippet.run() == "42"
+    assert Snippet("x = 1").run() == "Nenhum resultado encontrado."
+
+
+def test_pool_result(processes):
+    pool = SnippetPool(timeout=5, processes=processes)
+    try:
+        assert outcome(submit(pool, "result = 'ok'")) == ("ok", None)
+        result, error = outcome(submit(pool, "raise ValueError('bad')"))
+        assert result is None and isinstance(error, ValueError)
+    finally:
+        pool.shutdown()
+
+
+def test_pool_timeout(processes):
+    pool = SnippetPool(timeout=0.3, processes=processes)
+    try:
+        result, error = outcome(submit(pool, SLOW))
+        assert result is None and isinstance(error, TimeoutError)
+    finally:
+        pool.shutdown()
+
+
+def test_pool_busy(processes):
+    pool = SnippetPool(timeout=5, max_pending=1, processes=processes)
+    try:
+        first = submit(pool, SLOW)
+        result, error = outcome(submit(pool, "result = 'ok'"))
+        assert result is None and isinstance(error, RuntimeError)
+        assert outcome(first) == ("slow", None)
+        # A vaga é devolvida quando o snippet termina
+        assert outcome(submit(pool, "result = 'ok'")) == ("ok", None)
+    finally:
+        pool.shutdown()
+
+
+def test_thread_pool_cancels_queued_snippet(tmp_path):
+    marker = tmp_path / "ran"
+    pool = SnippetPool(workers=1, timeout=0.3, processes=False)
+    try:
+        first = submit(pool, SLOW)
+        queued = submit(pool, f"open({str(marker)!r}, 'w').close()")
+        assert isinstance(outcome(queued)[1], TimeoutError)
+        outcome(first)
+        time.sleep(0.1)
+        # Cancelado ainda na fila: nunca chegou a rodar
+        assert not marker.exists()
+    finally:
+        pool.shutdown()
+
+
+def test_process_pool_terminates_stuck_snippet():
+    pool = SnippetPool(workers=1, timeout=0.5, processes=True)
+    try:
+        result, error = outcome(submit(pool, STUCK))
+        assert isinstance(error, TimeoutError)
+        # O pool é recriado: o próximo snippet roda normalmente
+        assert outcome(submit(pool, "result = 'ok'")) == ("ok", None)
+    finally:
+        pool.shutdown()
+
+
+def test_expired_snippet_does_not_kill_newer_pool():
+    pool = SnippetPool(workers=2, timeout=1.0, processes=True)
+    try:
+        first = submit(pool, STUCK)
+        time.sleep(0.5)
+        second = submit(pool, STUCK)
+        assert isinstance(outcome(first)[1], TimeoutError)
+        # Enviado ao pool novo depois do primeiro timeout; o timeout do segundo (no pool antigo)
+        # não pode encerrá-lo
+        fast = submit(pool, "import time\ntime.sleep(0.8)\nresult = 'fast'")
+        assert isinstance(outcome(second)[1], TimeoutError)
+        assert outcome(fast) == ("fast", None)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,88 @@
+import importlib.util
+import json
+
+from conftest import record
+from hotstring_library import HotstringLibrary
+from hotstring_snippets import Snippet
+from hotstring_storage import HotstringStore, SnapshotCache, diff_hotstrings
+
+
+def make_store(path, library):
+    return HotstringStore(str(path), snapshot=lambda: library.all(), flush_delay=60)
+
+
+def test_journal_replay(tmp_path):
+    path = tmp_path / "hotstrings.json"
+    path.write_text(json.dumps({"hotstrings": [record("a")]}))
+    library = HotstringLibrary()
+    store = make_store(path, library)
+    for hotstring in store.load():
+        library.add(hotstring)
+    first = library.find_trigger("a")[0]
+
+    added = record("b")
+    library.add(added)
+    store.append("add", added)
+    store.append("replace", {**first, "replacement": "edited"})
+    store.append("delete", added)
+    store.flush()
+
+    reloaded = make_store(path, HotstringLibrary()).load()
+    assert [(hs["triggers"], hs["replacement"]) for hs in reloaded] == [(["a"], "edited")]
+
+
+def test_truncated_journal_line_is_ignored(tmp_path):
+    path = tmp_path / "hotstrings.json"
+    store = make_store(path, HotstringLibrary())
+    store.load()
+    store.append("add", record("a"))
+    store.flush()
+    with open(str(path) + ".journal", "a") as journal:
+        journal.write('{"seq": 2, "op": "add", "hotst')
+    assert [hs["triggers"] for hs in make_store(path, HotstringLibrary()).load()] == [["a"]]
+
+
+def test_compaction_rewrites_json_and_skips_old_journal(tmp_path):
+    path = tmp_path / "hotstrings.json"
+    library = HotstringLibrary()
+    store = make_store(path, library)
+    store.load()
+    store.profiles = {"Work": ["Geral"]}
+    hotstring = record("a")
+    library.add(hotstring)
+    store.append("add", hotstring)
+    store.flush()
+    journal = (tmp_path / "hotstrings.json.journal").read_text()
+
+    store.compact()
+    data = json.loads(path.read_text())
+    assert data["seq"] == 1 and data["profiles"] == {"Work": ["Geral"]}
+    assert not (tmp_path / "hotstrings.json.journal").exists()
+
+    # Falha entre a gravação do JSON e a remoção do journal: as operações não são reaplicadas
+    (tmp_path / "hotstrings.json.journal").write_text(journal)
+    assert len(make_store(path, HotstringLibrary()).load()) == 1
+
+
+def test_diff_hotstrings():
+    a, b, c = record("a"), record("b"), record("c")
+    library = HotstringLibrary([a, b])
+    new = [{**a, "replacement": "changed"}, c]
+    added, removed, changed = diff_hotstrings(library, new)
+    assert added == [c] and removed == [b]
+    assert [(old["replacement"], new["replacement"]) for old, new in changed] == [("x", "changed")]
+
+
+def test_snapshot_is_tied_to_sources_and_python_version(tmp_path, monkeypatch):
+    source = tmp_path / "hotstrings.json"
+    source.write_text("{}")
+    cache = SnapshotCache(str(tmp_path / "hotstrings.cache"), [str(source)])
+    cache.save({"snippet": Snippet("result = 'ok'")})
+    assert cache.load()["snippet"].run() == "ok"
+
+    # Code objects em marshal de outra versão do Python nunca são carregados
+    monkeypatch.setattr(importlib.util, "MAGIC_NUMBER", b"\0\0\r\n")
+    assert cache.load() is None
+    monkeypatch.undo()
+    source.write_text('{"hotstrings": []}')
+    assert cache.load() is None
@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+
+import hotstring_templates
+from hotstring_templates import Template, is_template
+
+
+def render(replacement):
+    return Template(replacement).render()
+
+
+def test_date_format():
+    today = datetime.datetime.now().strftime("%d/%m/%Y")
+    assert render("Hoje: {date:%d/%m/%Y}") == (f"Hoje: {today}", 0)
+
+
+def test_default_formats():
+    text, _ = render("{date} {time}")
+    datetime.datetime.strptime(text, "%Y-%m-%d %H:%M:%S")
+
+
+def test_literal_fields():
+    # Chaves dobradas geram o texto literal; outras chaves são texto comum
+    assert render("{{date}} {{date:%Y}} {nome}") == ("{date} {date:%Y} {nome}", 0)
+    assert not is_template("{nome}")
+    assert is_template("{clipboard}")
+
+
+def test_clipboard(monkeypatch):
+    class FakeClipboard:
+        PyperclipException = RuntimeError
+
+        @staticmethod
+        def paste():
+            return "copiado"
+
+    monkeypatch.setattr(hotstring_templates, "pyperclip", FakeClipboard)
+    assert render("[{clipboard}]") == ("[copiado]", 0)
+
+
+def test_clipboard_unavailable(monkeypatch):
+    monkeypatch.setattr(hotstring_templates, "pyperclip", None)
+    assert render("[{clipboard}]") == ("[]", 0)
+
+
+def test_cursor():
+    # Volta até o primeiro {cursor}; os seguintes são ignorados
+    assert render("<b>{cursor}</b>{cursor}!") == ("<b></b>!", 5)
+
+
+@pytest.mark.parametrize("fmt", ["%Q", "%Y%", "%-d"])
+def test_invalid_format(fmt):
+    with pytest.raises(ValueError):
+        Template("{date:" + fmt + "}")